@@ -1,6 +1,8 @@
 const canvas = document.getElementById('canvas');
 const ctx = canvas.getContext('2d');
-const socket = io('http://localhost:5001');
+// ?station=NAME connects to that station's namespace in a multi-station engine
+const station = new URLSearchParams(window.location.search).get('station');
+const socket = io('http://localhost:5001' + (station ? '/' + station : ''));
 
 let width, height;
 function resize() {
@@ -33,8 +35,100 @@ class Ripple {
 
 let ripples = [];
 
+// --- CALIBRATION DOTS ---
+// The engine sends normalized dot positions; we report back where (in
+// screen pixels) each dot was drawn so it can fit the camera->screen mapping.
+let calibrationDot = null;
+const statusBar = document.getElementById('status-bar');
+
+function drawCalibrationDot() {
+    if (!calibrationDot) return;
+    ctx.beginPath();
+    ctx.arc(calibrationDot.x, calibrationDot.y, 20, 0, Math.PI * 2);
+    ctx.fillStyle = '#ff00ea';
+    ctx.fill();
+}
+
+socket.on('calibration', (data) => {
+    if (data.done) {
+        calibrationDot = null;
+        statusBar.innerText = data.ok
+            ? `CALIBRATED (${data.error.toFixed(1)} px)`
+            : 'CALIBRATION FAILED';
+        return;
+    }
+    calibrationDot = { x: data.x * width, y: data.y * height };
+    statusBar.innerText = `CALIBRATING ${data.step + 1}/${data.points}`;
+    socket.emit('calibration_point', { step: data.step, x: calibrationDot.x, y: calibrationDot.y, width, height });
+});
+
+// --- LIVE CURSORS (binary 'state' stream, see streaming.py) ---
+const FLAG_SCREEN = 1;
+let latestState = null;
+let renderedSeq = -1;
+let latencyMs = null;
+let latencySamples = [];
+
+function decodeState(buffer) {
+    const view = new DataView(buffer);
+    const flags = view.getUint8(1);
+    const hands = view.getUint8(2);
+    const targets = view.getUint8(3);
+    const state = {
+        seq: view.getUint32(4, true),
+        captured: view.getFloat64(8, true),
+        screen: (flags & FLAG_SCREEN) !== 0,
+        cursors: [],
+        targets: [],
+    };
+    let offset = 16;
+    for (let i = 0; i < hands; i++, offset += 8) {
+        state.cursors.push([view.getFloat32(offset, true), view.getFloat32(offset + 4, true)]);
+    }
+    for (let i = 0; i < targets; i++, offset += 4) {
+        state.targets.push({ id: view.getUint16(offset, true), state: view.getUint8(offset + 2) });
+    }
+    return state;
+}
+
+socket.on('connect', () => socket.emit('subscribe'));
+
+socket.on('state', (buffer, ack) => {
+    latestState = decodeState(buffer);
+    // Ack on receipt: the engine keeps at most a couple of frames in flight per page
+    if (ack) ack();
+});
+
+function drawCursors() {
+    if (!latestState) return;
+    for (const [x, y] of latestState.cursors) {
+        const cx = latestState.screen ? x : x * width;
+        const cy = latestState.screen ? y : y * height;
+        ctx.beginPath();
+        ctx.arc(cx, cy, 12, 0, Math.PI * 2);
+        ctx.fillStyle = 'rgba(255, 255, 255, 0.8)';
+        ctx.fill();
+    }
+    if (latestState.seq !== renderedSeq) {
+        // Camera capture -> first paint of this frame's state
+        renderedSeq = latestState.seq;
+        const sample = Date.now() - latestState.captured;
+        latencyMs = latencyMs === null ? sample : 0.9 * latencyMs + 0.1 * sample;
+        latencySamples.push(sample);
+    }
+}
+
+setInterval(() => {
+    if (!latencySamples.length) return;
+    socket.emit('latency', { samples: latencySamples });
+    latencySamples = [];
+    if (!calibrationDot) statusBar.innerText = `AUTO-SCANNING ACTIVE · ${latencyMs.toFixed(0)} ms`;
+}, 2000);
+
 function animate() {
     ctx.clearRect(0, 0, width, height);
+    drawCalibrationDot();
+    drawCursors();
 
     for (let i = ripples.length - 1; i >= 0; i--) {
         ripples[i].update();
@@ -52,15 +146,19 @@ const video = document.getElementById('vibe-video');
 let isVibrating = false;
 
 socket.on('click', (data) => {
-    // If the hit is around the center (0.5, 0.5)
-    if (data.x > 0.4 && data.x < 0.6 && data.y > 0.4 && data.y < 0.6) {
+    // Every click is a hit on a projected target; data.id says which one
+    if (data.id !== undefined) {
         if (!isVibrating) {
             triggerVibration();
         }
     }
 
-    // Always spawn a ripple at the touch point
-    ripples.push(new Ripple(data.x * width, data.y * height));
+    // Always spawn a ripple at the touch point (projector pixels once calibrated)
+    if (data.sx !== undefined) {
+        ripples.push(new Ripple(data.sx, data.sy));
+    } else {
+        ripples.push(new Ripple(data.x * width, data.y * height));
+    }
 });
 
 function triggerVibration() {
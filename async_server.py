@@ -0,0 +1,156 @@
+"""
+Asyncio server mode for the Vision Engine
+
+Serves Socket.IO through python-socketio's AsyncServer on aiohttp instead
+of the eventlet WSGI stack:
+
+    python3 vision_engine.py --async
+
+Each station's pipeline runs on OS threads (its run() in an executor
+thread, trigger/render stages as plain threads), so the CPU-bound vision
+loop never shares a hub with socket I/O. Whatever a station emits goes
+through AsyncBridge onto that station's asyncio queue and is sent by its
+broadcast task on the event loop, in order.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+
+from metrics import registry
+from preview import BOUNDARY
+
+EMIT_QUEUED = registry.histogram('vision_async_emit_queue_seconds', "Emit call on a vision thread to the event loop sending it")
+EMIT_DROPPED = registry.counter('vision_async_emit_dropped_total', "Emits dropped because a station's broadcast queue was full")
+
+
+class AsyncBridge:
+    """
+    Thread-safe, synchronous emit() in front of a socketio.AsyncServer, so an
+    engine can use it exactly like the eventlet socketio.Server.
+    """
+
+    def __init__(self, sio, maxsize=1024):
+        self.sio = sio
+        self.maxsize = maxsize      # per-namespace backlog before the oldest emit is dropped
+        self.loop = None
+        self.queues = {}            # namespace -> asyncio.Queue
+        self.sent = 0
+        self.dropped = 0
+        self._tasks = []
+
+    def start(self, namespaces):
+        """Create the queues and broadcast tasks; call from the running loop"""
+        self.loop = asyncio.get_running_loop()
+        for namespace in namespaces:
+            queue = asyncio.Queue(self.maxsize)
+            self.queues[namespace] = queue
+            self._tasks.append(self.loop.create_task(self._broadcast(queue)))
+
+    def emit(self, event, data=None, to=None, namespace='/', callback=None):
+        if self.loop is None:
+            return
+        self.loop.call_soon_threadsafe(self._put, (event, data, to, namespace, callback, time.monotonic()))
+
+    def _put(self, item):
+        queue = self.queues.get(item[3])
+        if queue is None:
+            return
+        if queue.full():
+            # Like the pipeline queues: a stalled station loses its oldest message, not the newest
+            queue.get_nowait()
+            self.dropped += 1
+            EMIT_DROPPED.inc(namespace=item[3])
+        queue.put_nowait(item)
+
+    async def _broadcast(self, queue):
+        while True:
+            event, data, to, namespace, callback, queued = await queue.get()
+            EMIT_QUEUED.observe(time.monotonic() - queued, namespace=namespace)
+            try:
+                await self.sio.emit(event, data, to=to, namespace=namespace, callback=callback)
+                self.sent += 1
+            except Exception as e:
+                print(f"⚠️  Emit '{event}' to {namespace} failed: {e}")
+
+    def snapshot(self):
+        return {
+            'sent': self.sent,
+            'dropped': self.dropped,
+            'queued': sum(q.qsize() for q in self.queues.values()),
+        }
+
+
+def create_app(sio, engines, readiness, profiler=None):
+    """aiohttp twin of the Flask app: /metrics, /ready, /preview, /debug/profile"""
+    app = web.Application()
+    sio.attach(app)
+
+    async def metrics(request):
+        return web.Response(body=registry.render().encode(),
+                            headers={'Content-Type': 'text/plain; version=0.0.4'})
+
+    async def ready(request):
+        body, status = readiness()
+        return web.json_response(body, status=status)
+
+    async def preview(request):
+        station = request.match_info.get('station')
+        engine = engines.get(f"/{station}" if station else '/')
+        if engine is None or engine.preview is None:
+            raise web.HTTPNotFound()
+        response = web.StreamResponse(headers={
+            'Content-Type': f'multipart/x-mixed-replace; boundary={BOUNDARY}'})
+        await response.prepare(request)
+        frames = engine.preview.aframes()
+        try:
+            async for part in frames:
+                await response.write(part)
+        except ConnectionResetError:
+            pass    # viewer went away
+        finally:
+            await frames.aclose()
+        return response
+
+    async def debug_profile(request):
+        if profiler is None:
+            raise web.HTTPNotFound()
+        seconds = min(float(request.query.get('seconds', 5)), 60.0)
+        if not profiler.start(seconds):
+            return web.Response(text="profile already running\n", status=409)
+        while profiler.running:
+            await asyncio.sleep(0.1)
+        return web.Response(text=profiler.report())
+
+    app.router.add_get('/metrics', metrics)
+    app.router.add_get('/ready', ready)
+    app.router.add_get('/preview', preview)
+    app.router.add_get('/preview/{station}', preview)
+    app.router.add_get('/debug/profile', debug_profile)
+    return app
+
+
+def serve(app, bridge, namespaces, jobs, port, on_listen=None):
+    """Listen on port, then run each job (a blocking station run()) on its own executor thread"""
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        bridge.start(namespaces)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, port=port).start()
+        if on_listen is not None:
+            on_listen()
+        executor = ThreadPoolExecutor(max_workers=max(len(jobs), 1), thread_name_prefix='station')
+        for job in jobs:
+            loop.run_in_executor(executor, job).add_done_callback(report_failure)
+        # Keep serving after the stations stop, like eventlet.wsgi.server does
+        await asyncio.Event().wait()
+
+    def report_failure(future):
+        if future.exception() is not None:
+            print(f"❌ Station stopped with an error: {future.exception()!r}")
+
+    asyncio.run(main())
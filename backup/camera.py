@@ -6,9 +6,83 @@ Spread positivity with a simple gesture!
 
 import cv2
 import numpy as np
-import os
+import sys
 from pathlib import Path
 import random
+import time
+
+# Shared gesture library lives next to vision_engine.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import gestures
+from triggers import HoldTrigger
+
+class FaceScheduler:
+    """
+    Runs the Haar face detector on a downscaled frame every `interval` s
+    (every `idle_interval` s while nobody is around) and extrapolates the
+    boxes between runs from their last observed motion.
+    """
+    
+    def __init__(self, cascade, scale=0.5, interval=0.2, idle_interval=1.0, presence_timeout=2.0):
+        self.cascade = cascade
+        self.scale = scale
+        self.interval = interval
+        self.idle_interval = idle_interval
+        self.presence_timeout = presence_timeout   # s a face counts as present after last seen
+        self.tracks = []        # [box (x, y, w, h) float array, velocity (vx, vy), time]
+        self.last_run = float('-inf')
+        self.last_seen = float('-inf')
+        self.runs = 0
+        self._small = None
+        self._gray = None
+    
+    def present(self, now):
+        return now - self.last_seen <= self.presence_timeout
+    
+    def update(self, frame, now):
+        """Face boxes (x, y, w, h) in frame pixels for this frame"""
+        interval = self.interval if self.present(now) else self.idle_interval
+        if now - self.last_run >= interval:
+            self.detect(frame, now)
+        boxes = []
+        for box, velocity, t in self.tracks:
+            x, y = box[:2] + velocity * (now - t)
+            boxes.append((int(x), int(y), int(box[2]), int(box[3])))
+        return boxes
+    
+    def detect(self, frame, now):
+        self.last_run = now
+        self.runs += 1
+        h, w = frame.shape[:2]
+        size = (max(int(w * self.scale), 1), max(int(h * self.scale), 1))
+        if self._small is None or self._small.shape[:2] != (size[1], size[0]):
+            self._small = np.empty((size[1], size[0], 3), dtype=np.uint8)
+            self._gray = np.empty((size[1], size[0]), dtype=np.uint8)
+        small = cv2.resize(frame, size, dst=self._small, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        faces = self.cascade.detectMultiScale(gray, 1.3, 5)
+        
+        tracks = []
+        for box in np.asarray(faces, dtype=np.float32).reshape(-1, 4) / self.scale:
+            velocity = np.zeros(2, dtype=np.float32)
+            previous = self._match(box)
+            if previous is not None:
+                old_box, _, t = previous
+                velocity = (box[:2] - old_box[:2]) / max(now - t, 1e-3)
+            tracks.append([box, velocity, now])
+        self.tracks = tracks
+        if tracks:
+            self.last_seen = now
+    
+    def _match(self, box):
+        """Previous track whose center is within half a face width of `box`"""
+        center = box[:2] + box[2:] / 2
+        for track in self.tracks:
+            old = track[0]
+            if np.hypot(*(old[:2] + old[2:] / 2 - center)) < box[2] / 2:
+                return track
+        return None
+
 
 class PositivityBoostApp:
     """An app to boost your positivity!"""
@@ -47,9 +121,11 @@ class PositivityBoostApp:
         
         # Load face detection
         self.face_cascade = None
+        self.face_scheduler = None
         try:
             cascade_path = cv2.data.haarcascades
             self.face_cascade = cv2.CascadeClassifier(cascade_path + 'haarcascade_frontalface_default.xml')
+            self.face_scheduler = FaceScheduler(self.face_cascade)
             print("✓ Face detection ready!")
         except:
             pass
@@ -62,13 +138,31 @@ class PositivityBoostApp:
         self.overlay_alpha = 0.0
         self.target_alpha = 0.0
         self.fade_speed = 0.2
-        self.gesture_frames = 0
         self.required_frames = 10
+        self.thumbs_hold = HoldTrigger(self.required_frames)
         self.image_shown = False
         
+        # Hands inference only runs at full rate while someone is in front of the kiosk
+        self.idle_hands_interval = 0.5  # s between hand polls with no face or hand in view
+        self.hand_timeout = 1.0         # s a hand keeps inference awake without a face
+        self.last_hands_run = float('-inf')
+        self.last_hand_seen = float('-inf')
+        self.frames = 0
+        self.hands_runs = 0
+        
         # UI dimensions (1400x900 window)
         self.window_width = 1400
         self.window_height = 900
+        self.camera_rect = (50, 160, 600, 450)     # x, y, width, height
+        self.quotes_rect = (700, 160, 650, 450)
+        
+        # Cached render layers
+        self._background = None     # static UI, drawn once
+        self._base = None           # background + current quote
+        self._base_quote = None
+        self._surprise = None       # (pre-resized surprise image, x, y)
+        self._ui = None             # reused output buffer
+        self._ui_dirty = True       # output needs the base layer copied back in
         
         # Motivational quotes
         self.quotes = [
@@ -99,56 +193,13 @@ class PositivityBoostApp:
         
         print("⚠️  No image found")
     
-    def detect_thumbs_up(self, hand_landmarks, handedness):
-        """Detect thumbs up gesture"""
-        if not hand_landmarks:
-            return False, 0.0
-        
-        landmarks = hand_landmarks.landmark
-        
-        # Thumb landmarks
-        thumb_tip = landmarks[4]
-        thumb_ip = landmarks[3]
-        thumb_mcp = landmarks[2]
-        
-        # Other fingers
-        index_tip = landmarks[8]
-        index_pip = landmarks[6]
-        middle_tip = landmarks[12]
-        middle_pip = landmarks[10]
-        ring_tip = landmarks[16]
-        ring_pip = landmarks[14]
-        pinky_tip = landmarks[20]
-        pinky_pip = landmarks[18]
-        
-        # Check thumb up
-        thumb_up = thumb_tip.y < thumb_ip.y < thumb_mcp.y
-        
-        # Check fingers curled
-        index_curled = index_tip.y > index_pip.y
-        middle_curled = middle_tip.y > middle_pip.y
-        ring_curled = ring_tip.y > ring_pip.y
-        pinky_curled = pinky_tip.y > pinky_pip.y
-        
-        # Calculate confidence
-        confidence = 0.0
-        if thumb_up: confidence += 0.4
-        if index_curled: confidence += 0.15
-        if middle_curled: confidence += 0.15
-        if ring_curled: confidence += 0.15
-        if pinky_curled: confidence += 0.15
-        
-        return confidence >= 0.7, confidence
-    
-    def create_ui_frame(self, camera_frame):
-        """Create the full UI with camera preview and quotes"""
-        # Create blank canvas
-        ui = np.ones((self.window_height, self.window_width, 3), dtype=np.uint8) * 240
+    def render_background(self):
+        """Static layer: gradient, header, panel frames, messages and instructions (drawn once)"""
+        ui = np.empty((self.window_height, self.window_width, 3), dtype=np.uint8)
         
-        # Add gradient background
-        for i in range(self.window_height):
-            color_val = int(240 - (i / self.window_height) * 40)
-            ui[i, :] = [color_val, color_val + 10, color_val + 15]
+        # Add gradient background (one vectorized pass instead of a per-row loop)
+        rows = (240 - np.arange(self.window_height) / self.window_height * 40).astype(np.int32)
+        ui[:] = np.stack([rows, rows + 10, rows + 15], axis=-1)[:, None, :].astype(np.uint8)
         
         # ===== HEADER =====
         header_height = 120
@@ -167,14 +218,8 @@ class PositivityBoostApp:
         subtitle_x = (self.window_width - subtitle_size[0]) // 2
         cv2.putText(ui, subtitle, (subtitle_x, 105), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 200), 2)
         
-        # ===== CAMERA PREVIEW (LEFT SIDE) =====
-        camera_x = 50
-        camera_y = 160
-        camera_width = 600
-        camera_height = 450
-        
-        # Resize camera frame
-        camera_resized = cv2.resize(camera_frame, (camera_width, camera_height))
+        # ===== CAMERA PREVIEW FRAME (LEFT SIDE) =====
+        camera_x, camera_y, camera_width, camera_height = self.camera_rect
         
         # Add border
         border_color = (70, 130, 180)
@@ -184,19 +229,13 @@ class PositivityBoostApp:
                      (camera_x + camera_width + border_thickness, camera_y + camera_height + border_thickness),
                      border_color, border_thickness)
         
-        # Place camera frame
-        ui[camera_y:camera_y+camera_height, camera_x:camera_x+camera_width] = camera_resized
-        
         # Camera label
         cv2.rectangle(ui, (camera_x, camera_y - 35), (camera_x + 200, camera_y - 5), (70, 130, 180), -1)
         cv2.putText(ui, "LIVE CAMERA", (camera_x + 10, camera_y - 12), 
                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
         
         # ===== QUOTES SECTION (RIGHT SIDE) =====
-        quotes_x = 700
-        quotes_y = 160
-        quotes_width = 650
-        quotes_height = 450
+        quotes_x, quotes_y, quotes_width, quotes_height = self.quotes_rect
         
         # Quote box background
         cv2.rectangle(ui, (quotes_x, quotes_y), (quotes_x + quotes_width, quotes_y + quotes_height), 
@@ -210,15 +249,6 @@ class PositivityBoostApp:
         cv2.putText(ui, "DAILY INSPIRATION", (quotes_x + 20, quotes_y + 40), 
                    cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2)
         
-        # Main quote
-        quote_y = quotes_y + 150
-        quote_font = cv2.FONT_HERSHEY_SIMPLEX
-        quote_scale = 1.5
-        quote_size = cv2.getTextSize(self.current_quote, quote_font, quote_scale, 3)[0]
-        quote_x = quotes_x + (quotes_width - quote_size[0]) // 2
-        cv2.putText(ui, self.current_quote, (quote_x, quote_y), 
-                   quote_font, quote_scale, (70, 130, 180), 3)
-        
         # Motivational messages
         messages = [
             "✨ You are capable of amazing things",
@@ -267,14 +297,63 @@ class PositivityBoostApp:
         
         return ui
     
-    def draw_face_detection(self, frame):
+    def render_quote(self):
+        """Quote layer: background plus the current quote, redrawn only when the quote changes"""
+        if self._background is None:
+            self._background = self.render_background()
+        base = self._background.copy()
+        quotes_x, quotes_y, quotes_width, _ = self.quotes_rect
+        quote_y = quotes_y + 150
+        quote_font = cv2.FONT_HERSHEY_SIMPLEX
+        quote_scale = 1.5
+        quote_size = cv2.getTextSize(self.current_quote, quote_font, quote_scale, 3)[0]
+        quote_x = quotes_x + (quotes_width - quote_size[0]) // 2
+        cv2.putText(base, self.current_quote, (quote_x, quote_y), 
+                   quote_font, quote_scale, (70, 130, 180), 3)
+        self._base = base
+        self._base_quote = self.current_quote
+        self._ui_dirty = True
+    
+    def create_ui_frame(self, camera_frame):
+        """
+        Composite the UI into a reused buffer: the cached background/quote
+        layer is copied in only when something covered it last frame, then
+        the camera preview is resized straight into its slot.
+        """
+        if self._base is None or self._base_quote != self.current_quote:
+            self.render_quote()
+        if self._ui is None:
+            self._ui = np.empty_like(self._base)
+        if self._ui_dirty:
+            np.copyto(self._ui, self._base)
+            self._ui_dirty = False
+        
+        camera_x, camera_y, camera_width, camera_height = self.camera_rect
+        cv2.resize(camera_frame, (camera_width, camera_height),
+                   dst=self._ui[camera_y:camera_y+camera_height, camera_x:camera_x+camera_width])
+        return self._ui
+    
+    def surprise_layer(self):
+        """Surprise image resized to fit the window once, with its centered offset"""
+        if self._surprise is None:
+            h, w = self.surprise_image.shape[:2]
+            aspect = w / h
+            
+            new_w = self.window_width
+            new_h = int(new_w / aspect)
+            
+            if new_h > self.window_height:
+                new_h = self.window_height
+                new_w = int(new_h * aspect)
+            
+            # Center it
+            y_offset = (self.window_height - new_h) // 2
+            x_offset = (self.window_width - new_w) // 2
+            self._surprise = (cv2.resize(self.surprise_image, (new_w, new_h)), x_offset, y_offset)
+        return self._surprise
+    
+    def draw_face_detection(self, frame, faces):
         """Draw face detection overlay"""
-        if self.face_cascade is None:
-            return frame
-        
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = self.face_cascade.detectMultiScale(gray, 1.3, 5)
-        
         for (x, y, w, h) in faces:
             # Draw box
             cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
@@ -287,38 +366,55 @@ class PositivityBoostApp:
             
         return frame
     
+    def hands_awake(self, now):
+        """Full-rate hand inference while a face or hand is around, a slow poll otherwise"""
+        if self.face_scheduler is None or self.face_scheduler.present(now):
+            return True
+        if now - self.last_hand_seen <= self.hand_timeout:
+            return True
+        return now - self.last_hands_run >= self.idle_hands_interval
+    
     def process_frame(self, camera_frame):
         """Process camera frame and create UI"""
         # Flip for mirror
         camera_frame = cv2.flip(camera_frame, 1)
         
+        now = time.monotonic()
+        self.frames += 1
+        
+        # Faces at reduced resolution/cadence, tracked in between
+        faces = self.face_scheduler.update(camera_frame, now) if self.face_scheduler else []
+        
         # Detect thumbs up
         thumbs_up_detected = False
         
-        if self.hands_detector:
+        if self.hands_detector and self.hands_awake(now):
+            self.last_hands_run = now
+            self.hands_runs += 1
             rgb_frame = cv2.cvtColor(camera_frame, cv2.COLOR_BGR2RGB)
             results = self.hands_detector.process(rgb_frame)
+            if results.multi_hand_landmarks:
+                self.last_hand_seen = now
             
             if results.multi_hand_landmarks and results.multi_handedness:
-                for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
-                    is_thumbs, conf = self.detect_thumbs_up(hand_landmarks, handedness)
-                    if is_thumbs:
+                # Score every hand in one vectorized pass
+                landmarks = gestures.landmarks_to_array(results)
+                confidences = gestures.thumbs_up(landmarks)
+                for hand_landmarks, conf in zip(results.multi_hand_landmarks, confidences):
+                    if conf >= 0.7:
                         thumbs_up_detected = True
                         # Draw hand landmarks on camera frame
                         self.mp_draw.draw_landmarks(camera_frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
                         break
         
         # Draw face detection
-        camera_frame = self.draw_face_detection(camera_frame)
+        camera_frame = self.draw_face_detection(camera_frame, faces)
         
         # Update gesture state
-        if thumbs_up_detected:
-            self.gesture_frames += 1
-            if self.gesture_frames >= self.required_frames:
-                self.target_alpha = 1.0
-                self.image_shown = True
-        else:
-            self.gesture_frames = 0
+        # Same hold rule landmark_log.py replays offline
+        if self.thumbs_hold.update(thumbs_up_detected):
+            self.target_alpha = 1.0
+            self.image_shown = True
         
         # Smooth fade
         if self.overlay_alpha < self.target_alpha:
@@ -331,27 +427,13 @@ class PositivityBoostApp:
         
         # If image should be shown, overlay it on full screen
         if self.overlay_alpha > 0.01 and self.surprise_image is not None:
-            # Resize surprise image to fit window
-            h, w = self.surprise_image.shape[:2]
-            aspect = w / h
-            
-            new_w = self.window_width
-            new_h = int(new_w / aspect)
-            
-            if new_h > self.window_height:
-                new_h = self.window_height
-                new_w = int(new_h * aspect)
-            
-            surprise_resized = cv2.resize(self.surprise_image, (new_w, new_h))
-            
-            # Center it
-            y_offset = (self.window_height - new_h) // 2
-            x_offset = (self.window_width - new_w) // 2
+            surprise, x_offset, y_offset = self.surprise_layer()
+            new_h, new_w = surprise.shape[:2]
             
-            # Blend
-            overlay = ui_frame.copy()
-            overlay[y_offset:y_offset+new_h, x_offset:x_offset+new_w] = surprise_resized
-            ui_frame = cv2.addWeighted(ui_frame, 1 - self.overlay_alpha, overlay, self.overlay_alpha, 0)
+            # Blend in place; outside the image the blend would leave the UI unchanged anyway
+            region = ui_frame[y_offset:y_offset+new_h, x_offset:x_offset+new_w]
+            cv2.addWeighted(region, 1 - self.overlay_alpha, surprise, self.overlay_alpha, 0, dst=region)
+            self._ui_dirty = True
         
         # Update quote periodically
         self.quote_timer += 1
@@ -400,6 +482,10 @@ class PositivityBoostApp:
         cv2.destroyAllWindows()
         if self.hands_detector:
             self.hands_detector.close()
+        if self.frames:
+            faces = self.face_scheduler.runs if self.face_scheduler else 0
+            print(f"📊 Hands inference on {self.hands_runs}/{self.frames} frames, "
+                  f"face detector on {faces}")
         print("\n👋 Thanks for spreading positivity!\n")
 
 def main():
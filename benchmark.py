@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Offline Vision Engine benchmark
+
+Replays recorded frames through the engine's capture -> inference -> trigger
+path as fast as possible (no webcam, no GPU, no preview window) and prints
+throughput, per-frame latency percentiles and a per-stage breakdown as JSON.
+
+    python3 benchmark.py                         # Target_Circle_15.mp4 + photo/
+    python3 benchmark.py --source clip.mp4 --loops 3 --output bench.json
+    python3 benchmark.py --cold-start 5          # process launch -> listening -> ready
+    python3 benchmark.py --compare-servers 1,10,50   # eventlet vs --async with N clients
+"""
+
+import argparse
+import gc
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from frame_sources import open_source
+from vision_engine import InferenceGovernor, VisionEngine
+
+ROOT = Path(__file__).parent
+DEFAULT_SOURCES = [str(ROOT / 'Target_Circle_15.mp4'), str(ROOT / 'photo')]
+_scratch = None     # TemporaryDirectory for engine subprocess state files
+
+
+def summarize(samples):
+    """Latency summary in milliseconds"""
+    if not samples:
+        return {'count': 0}
+    ms = np.asarray(samples) * 1000.0
+    return {
+        'count': int(ms.size),
+        'mean': round(float(ms.mean()), 3),
+        'p50': round(float(np.percentile(ms, 50)), 3),
+        'p95': round(float(np.percentile(ms, 95)), 3),
+        'p99': round(float(np.percentile(ms, 99)), 3),
+        'max': round(float(ms.max()), 3),
+    }
+
+
+class GCTimer:
+    """Counts garbage collections and the time spent in them"""
+
+    def __init__(self):
+        self.collections = 0
+        self.seconds = 0.0
+        self._start = None
+
+    def __call__(self, phase, info):
+        if phase == 'start':
+            self._start = time.perf_counter()
+        elif self._start is not None:
+            self.collections += 1
+            self.seconds += time.perf_counter() - self._start
+            self._start = None
+
+
+def bench_source(spec, loops=1, warmup=5, scan_interval=0.0, image_loops=100, roi=False,
+                 target_fps=None, ring_slots=0, trace_alloc=False, motion_gate=False):
+    # A folder of stills is tiny, so replay it enough times to get stable numbers
+    if Path(str(spec)).is_dir():
+        loops = loops * image_loops
+    source = open_source(spec, loops=loops)
+    if not source.isOpened():
+        return {'error': f"could not open {spec}"}
+
+    governor = InferenceGovernor(target_fps) if target_fps else None
+    engine = VisionEngine(source=source, headless=True, roi=roi, governor=governor,
+                          ring_slots=ring_slots)
+    engine.scan_interval = scan_interval
+    if motion_gate:
+        engine.enable_motion_gate()
+
+    totals = []
+    stages = {}
+    frames = 0
+    started = None
+    gc_timer = GCTimer()
+    faults = 0
+    transient = []
+    while True:
+        if trace_alloc and started is not None:
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        t0 = time.perf_counter()
+        packet = engine.capture_frame()
+        if packet is None:
+            break
+        engine.infer(packet)
+        engine.handle(packet)
+        packet.release()
+        elapsed = time.perf_counter() - t0
+        if trace_alloc and started is not None:
+            transient.append(tracemalloc.get_traced_memory()[1] - base)
+
+        frames += 1
+        if frames <= warmup:
+            continue
+        if started is None:
+            started = t0
+            # Minor page faults track fresh (mmap'd) frame-sized allocations
+            faults = resource.getrusage(resource.RUSAGE_SELF).ru_minflt
+            gc.callbacks.append(gc_timer)
+            if trace_alloc:
+                tracemalloc.start()
+        totals.append(elapsed)
+        for stage, seconds in packet.timings.items():
+            stages.setdefault(stage, []).append(seconds)
+
+    wall = (time.perf_counter() - started) if started else 0.0
+    faults = resource.getrusage(resource.RUSAGE_SELF).ru_minflt - faults
+    if gc_timer in gc.callbacks:
+        gc.callbacks.remove(gc_timer)
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    source.release()
+    engine.hands.close()
+    result = {
+        'frames': len(totals),
+        'warmup_frames': min(frames, warmup),
+        'fps': round(len(totals) / wall, 2) if wall else 0.0,
+        'latency_ms': summarize(totals),
+        'stages_ms': {stage: summarize(samples) for stage, samples in stages.items()},
+    }
+    result['memory'] = {
+        'minor_faults_per_frame': round(faults / len(totals), 1) if totals else 0.0,
+        'gc_collections': gc_timer.collections,
+        'gc_ms': round(gc_timer.seconds * 1000.0, 3),
+    }
+    if transient:
+        # Python/NumPy/cv2 bytes allocated and freed within one frame
+        result['memory']['transient_kb_per_frame'] = round(float(np.mean(transient)) / 1024, 1)
+    if engine.frame_ring is not None:
+        result['memory']['frame_ring'] = engine.frame_ring.snapshot()
+    if governor:
+        result['governor'] = governor.snapshot()
+    if engine.motion is not None:
+        result['motion'] = engine.motion.snapshot()
+    return result
+
+
+def scratch_files():
+    """Engine flags that keep a measurement run from writing the repo's tracked lock file"""
+    global _scratch
+    if _scratch is None:
+        _scratch = tempfile.TemporaryDirectory(prefix='vision-bench-')     # removed at exit
+    return ['--lock-file', str(Path(_scratch.name) / 'center_lock.npy')]
+
+
+def cold_start(source, runs=3, port=5099, timeout=60.0):
+    """Launch vision_engine.py repeatedly and time listening and /ready from process start"""
+    url = f"http://127.0.0.1:{port}/ready"
+    samples = {'listen': [], 'ready': []}
+    phases = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, str(ROOT / 'vision_engine.py'), '--source', str(source),
+             '--headless', '--port', str(port)] + scratch_files(),
+            cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        listening = None
+        try:
+            while time.perf_counter() - t0 < timeout:
+                try:
+                    with urllib.request.urlopen(url, timeout=1.0) as response:
+                        body = json.loads(response.read())
+                    listening = listening or time.perf_counter() - t0
+                    samples['ready'].append(time.perf_counter() - t0)
+                    phases.append(body)
+                    break
+                except urllib.error.HTTPError:
+                    # 503: server is up, engine still starting
+                    listening = listening or time.perf_counter() - t0
+                except OSError:
+                    pass
+                time.sleep(0.01)
+        finally:
+            proc.terminate()
+            proc.wait()
+        if listening is not None:
+            samples['listen'].append(listening)
+
+    result = {
+        'runs': runs,
+        'listen_ms': summarize(samples['listen']),
+        'ready_ms': summarize(samples['ready']),
+    }
+    if phases:
+        result['last_run'] = {'process': phases[-1]['startup'], 'stations': phases[-1]['stations']}
+    return result
+
+
+def wait_ready(port, timeout=60.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/ready", timeout=1.0):
+                return True
+        except OSError:     # includes the 503 HTTPError while starting
+            time.sleep(0.05)
+    return False
+
+
+def server_run(source, mode, clients, port=5099, seconds=5.0):
+    """
+    Launch the engine in `mode` ('eventlet' or 'asyncio'), connect `clients`
+    subscribers and time connects and capture -> receive of the binary state stream
+    """
+    import socketio
+    from streaming import HEADER
+
+    command = [sys.executable, str(ROOT / 'vision_engine.py'), '--source', str(source),
+               '--loop', '--headless', '--port', str(port)] + scratch_files()
+    if mode == 'asyncio':
+        command.append('--async')
+    proc = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    connect, latency, sockets = [], [], []
+    try:
+        if not wait_ready(port):
+            return {'clients': clients, 'error': 'engine not ready'}
+
+        def on_state(data):
+            # Capture time is epoch ms, so compare it to this process's wall clock
+            latency.append(time.time() - HEADER.unpack_from(data)[5] / 1000.0)
+            return True
+
+        for _ in range(clients):
+            client = socketio.Client()
+            client.on('state', on_state)
+            t0 = time.perf_counter()
+            client.connect(f"http://127.0.0.1:{port}", transports=['websocket'])
+            connect.append(time.perf_counter() - t0)
+            client.emit('subscribe')
+            sockets.append(client)
+        del latency[:]
+        time.sleep(seconds)
+        received = len(latency)
+    finally:
+        for client in sockets:
+            client.disconnect()
+        proc.terminate()
+        proc.wait()
+    return {
+        'clients': clients,
+        'connect_ms': summarize(connect),
+        'latency_ms': summarize(latency),
+        'messages_per_client_s': round(received / clients / seconds, 1) if clients else 0.0,
+    }
+
+
+def compare_servers(source, client_counts, port=5099, seconds=5.0):
+    return {mode: [server_run(source, mode, n, port, seconds) for n in client_counts]
+            for mode in ('eventlet', 'asyncio')}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline Vision Engine benchmark")
+    parser.add_argument('--source', action='append',
+                        help="video file, image directory or camera index (repeatable)")
+    parser.add_argument('--loops', type=int, default=1, help="passes over each source")
+    parser.add_argument('--image-loops', type=int, default=100,
+                        help="extra repeat factor for image directories")
+    parser.add_argument('--warmup', type=int, default=5, help="frames excluded from stats")
+    parser.add_argument('--scan-interval', type=float, default=0.0,
+                        help="seconds between find_button scans (0 = every frame)")
+    parser.add_argument('--roi', action='store_true', help="enable ROI hand inference")
+    parser.add_argument('--target-fps', type=float,
+                        help="enable the inference governor with this FPS target")
+    parser.add_argument('--motion-gate', action='store_true',
+                        help="skip hand inference on static frames")
+    parser.add_argument('--frame-ring', type=int, default=0, metavar='SLOTS',
+                        help="capture into a preallocated ring of SLOTS buffers")
+    parser.add_argument('--trace-alloc', action='store_true',
+                        help="measure per-frame transient allocations with tracemalloc (slower)")
+    parser.add_argument('--cold-start', type=int, metavar='RUNS',
+                        help="instead of frame throughput, time RUNS engine launches to /ready")
+    parser.add_argument('--compare-servers', metavar='N,N,...',
+                        help="instead of frame throughput, compare eventlet and --async serving "
+                             "these numbers of subscribed clients")
+    parser.add_argument('--output', help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.cold_start:
+        source = (args.source or DEFAULT_SOURCES)[0]
+        print(f"⏱️  Cold-starting the engine {args.cold_start}x on {source}...")
+        report = {'cold_start': cold_start(source, args.cold_start)}
+        text = json.dumps(report, indent=2)
+        print(text)
+        if args.output:
+            Path(args.output).write_text(text + "\n")
+        return
+
+    if args.compare_servers:
+        source = (args.source or DEFAULT_SOURCES)[0]
+        counts = [int(n) for n in args.compare_servers.split(',')]
+        print(f"⏱️  Comparing eventlet and asyncio serving with {counts} clients on {source}...")
+        report = {'servers': compare_servers(source, counts)}
+        text = json.dumps(report, indent=2)
+        print(text)
+        if args.output:
+            Path(args.output).write_text(text + "\n")
+        return
+
+    report = {'sources': {}}
+    for spec in args.source or DEFAULT_SOURCES:
+        print(f"⏱️  Benchmarking {spec}...")
+        report['sources'][spec] = bench_source(
+            spec, args.loops, args.warmup, args.scan_interval, args.image_loops, args.roi,
+            args.target_fps, args.frame_ring, args.trace_alloc, args.motion_gate)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
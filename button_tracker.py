@@ -0,0 +1,131 @@
+"""
+Incremental cyan-button tracker
+
+After the first full-frame detection, only a small window around the last
+known center is searched (at reduced resolution); a full-frame scan happens
+again only when the button is lost. HSV / mask buffers are preallocated and
+reused, so a per-frame update costs a fraction of a millisecond.
+"""
+
+import cv2
+import numpy as np
+
+
+class ButtonTracker:
+    """Track the largest cyan blob between frames (detect_all finds every button)"""
+
+    def __init__(self, lower, upper, scale=0.5, search_factor=2.5,
+                 min_radius=20, max_radius=300, max_misses=3):
+        self.lower = np.asarray(lower, dtype=np.uint8)
+        self.upper = np.asarray(upper, dtype=np.uint8)
+        self.scale = scale                  # resolution of the local search
+        self.search_factor = search_factor  # window half-size in button radii
+        self.min_radius = min_radius
+        self.max_radius = max_radius
+        self.max_misses = max_misses        # local misses before a full rescan
+
+        self.center = None
+        self.radius = None
+        self.misses = 0
+        self.full_scans = 0
+        self.local_scans = 0
+        self._buffers = {}
+
+    def _buffers_for(self, h, w):
+        key = (h, w)
+        bufs = self._buffers.get(key)
+        if bufs is None:
+            if len(self._buffers) > 8:
+                self._buffers.clear()
+            bufs = {
+                'small': np.empty((h, w, 3), dtype=np.uint8),
+                'hsv': np.empty((h, w, 3), dtype=np.uint8),
+                'mask': np.empty((h, w), dtype=np.uint8),
+                'tmp': np.empty((h, w), dtype=np.uint8),
+            }
+            self._buffers[key] = bufs
+        return bufs
+
+    def _contours(self, image, scale):
+        h, w = image.shape[:2]
+        sh, sw = max(int(h * scale), 1), max(int(w * scale), 1)
+        bufs = self._buffers_for(sh, sw)
+        if scale != 1.0:
+            src = cv2.resize(image, (sw, sh), dst=bufs['small'], interpolation=cv2.INTER_AREA)
+        else:
+            src = image
+        hsv = cv2.cvtColor(src, cv2.COLOR_BGR2HSV, dst=bufs['hsv'])
+        mask = cv2.inRange(hsv, self.lower, self.upper, dst=bufs['mask'])
+        tmp = cv2.erode(mask, None, dst=bufs['tmp'], iterations=2)
+        mask = cv2.dilate(tmp, None, dst=bufs['mask'], iterations=2)
+
+        # findContours no longer modifies its input, so no mask.copy() needed
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        return contours
+
+    def detect(self, image, scale=1.0):
+        """Largest cyan circle in `image` as ((x, y), radius) in image pixels, or (None, None)"""
+        contours = self._contours(image, scale)
+        if contours:
+            c = max(contours, key=cv2.contourArea)
+            ((x, y), radius) = cv2.minEnclosingCircle(c)
+            x, y, radius = x / scale, y / scale, radius / scale
+            if self.min_radius < radius < self.max_radius:
+                return (x, y), radius
+        return None, None
+
+    def detect_all(self, image, scale=1.0):
+        """Every cyan circle within the radius bounds as [((x, y), radius), ...], largest first"""
+        self.full_scans += 1
+        found = []
+        for c in self._contours(image, scale):
+            ((x, y), radius) = cv2.minEnclosingCircle(c)
+            x, y, radius = x / scale, y / scale, radius / scale
+            if self.min_radius < radius < self.max_radius:
+                found.append(((int(x), int(y)), int(radius)))
+        found.sort(key=lambda b: -b[1])
+        return found
+
+    def full_scan(self, frame):
+        self.full_scans += 1
+        center, radius = self.detect(frame)
+        self._accept(center, radius)
+        return self.result()
+
+    def update(self, frame):
+        """Local search around the last center; full scan when unknown or lost"""
+        if self.center is None or self.misses >= self.max_misses:
+            return self.full_scan(frame)
+
+        h, w = frame.shape[:2]
+        cx, cy = self.center
+        half = int(max(self.radius * self.search_factor, 2 * self.min_radius))
+        x0, y0 = max(int(cx) - half, 0), max(int(cy) - half, 0)
+        x1, y1 = min(int(cx) + half, w), min(int(cy) + half, h)
+        if x1 <= x0 or y1 <= y0:
+            return self.full_scan(frame)
+
+        self.local_scans += 1
+        center, radius = self.detect(frame[y0:y1, x0:x1], self.scale)
+        if center is None:
+            self.misses += 1
+            if self.misses >= self.max_misses:
+                return self.full_scan(frame)
+            return self.result()
+        self._accept((center[0] + x0, center[1] + y0), radius)
+        return self.result()
+
+    def _accept(self, center, radius):
+        if center is None:
+            self.misses += 1
+            if self.center is not None and self.misses >= self.max_misses:
+                self.center, self.radius = None, None
+            return
+        self.center, self.radius = center, radius
+        self.misses = 0
+
+    def result(self):
+        """Last known ((x, y), radius) in integer pixels, or (None, None)"""
+        if self.center is None:
+            return None, None
+        return (int(self.center[0]), int(self.center[1])), int(self.radius)
@@ -0,0 +1,142 @@
+"""
+Camera -> projector calibration
+
+A 3x3 homography maps (mirrored) camera pixels to screen pixels of the
+projected page. It is estimated from dots that app.js projects at known
+screen positions and the engine then finds in the camera image, and is
+persisted with its format version, camera frame size and screen size in
+screen_calibration.npz. A legacy bare 3x3 calibration.npy is never loaded:
+nothing records which camera or screen it was fitted for.
+
+A homography is only applied if it passes a sanity check: the camera frame
+center lands on the screen and the frame corners land within a margin of
+it. A fit from mis-detected dots otherwise sends every cursor off-screen.
+
+Mapping is a table lookup: the homography is evaluated once per camera
+resolution into an (h, w, 2) float32 table, so transforming the fingertips
+of a frame is a single fancy-index instead of a perspective divide.
+"""
+
+import os
+
+import cv2
+import numpy as np
+
+# Normalized screen positions of the projected calibration dots (3x3 grid)
+CALIBRATION_POINTS = [(x, y) for y in (0.1, 0.5, 0.9) for x in (0.1, 0.5, 0.9)]
+
+# Dots are drawn in the page's --secondary magenta so they never look like a cyan button
+DOT_LOWER = (140, 100, 100)
+DOT_UPPER = (170, 255, 255)
+
+FORMAT_VERSION = 2
+CORNER_MARGIN = 0.5     # frame corners may land this many screen widths/heights off-screen
+
+
+class Calibration:
+    """Camera px -> screen px homography with per-resolution remap tables"""
+
+    def __init__(self, homography, frame_size, screen_size):
+        self.homography = np.asarray(homography, dtype=np.float64).reshape(3, 3)
+        self.frame_size = tuple(int(v) for v in frame_size)        # camera (w, h) it was fitted on
+        self.screen_size = tuple(float(v) for v in screen_size)    # page (w, h) in screen px
+        self._tables = {}
+
+    @classmethod
+    def load(cls, path):
+        """Saved calibration, None if there is none; ValueError for another format"""
+        if not os.path.exists(path):
+            return None
+        try:
+            data = np.load(path)
+            version = int(data['version'])
+        except Exception:
+            raise ValueError(f"{path} is not a calibration file (version {FORMAT_VERSION})") from None
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path} has calibration format {version}, expected {FORMAT_VERSION}")
+        return cls(data['homography'], data['frame_size'], data['screen_size'])
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            np.savez(f, version=FORMAT_VERSION, homography=self.homography,
+                     frame_size=self.frame_size, screen_size=self.screen_size)
+
+    def problem(self):
+        """Why this homography must not be applied, or None if it maps the frame onto the screen"""
+        w, h = self.frame_size
+        sw, sh = self.screen_size
+        corners = np.array([[0, 0], [w, 0], [w, h], [0, h]], dtype=np.float64)
+        points = np.hstack([np.vstack([corners, [[w / 2, h / 2]]]), np.ones((5, 1))]) @ self.homography.T
+        if np.any(points[:, 2] <= 0):
+            return "the camera frame folds across the horizon"
+        points = points[:, :2] / points[:, 2:]
+        cx, cy = points[4]
+        if not (0 <= cx <= sw and 0 <= cy <= sh):
+            return f"the frame center maps off-screen to ({cx:.0f}, {cy:.0f})"
+        mx, my = CORNER_MARGIN * sw, CORNER_MARGIN * sh
+        for x, y in points[:4]:
+            if not (-mx <= x <= sw + mx and -my <= y <= sh + my):
+                return f"a frame corner maps far off-screen to ({x:.0f}, {y:.0f})"
+        return None
+
+    @classmethod
+    def from_points(cls, camera_points, screen_points, frame_size, screen_size):
+        """Fit from >= 4 correspondences; returns (Calibration, mean reprojection error px)"""
+        src = np.asarray(camera_points, dtype=np.float32).reshape(-1, 1, 2)
+        dst = np.asarray(screen_points, dtype=np.float32).reshape(-1, 1, 2)
+        homography, _ = cv2.findHomography(src, dst, cv2.RANSAC, 10.0)
+        if homography is None:
+            return None, None
+        calibration = cls(homography, frame_size, screen_size)
+        projected = cv2.perspectiveTransform(src, homography)
+        error = float(np.linalg.norm(projected - dst, axis=-1).mean())
+        return calibration, error
+
+    def table(self, w, h):
+        """(h, w, 2) float32 screen position of every camera pixel"""
+        table = self._tables.get((w, h))
+        if table is None:
+            grid = np.mgrid[0:h, 0:w][::-1].transpose(1, 2, 0).astype(np.float32)
+            # Fitted at frame_size: rescale another capture resolution into those pixels
+            grid *= np.array([self.frame_size[0] / w, self.frame_size[1] / h], dtype=np.float32)
+            table = cv2.perspectiveTransform(grid.reshape(-1, 1, 2), self.homography)
+            table = self._tables[(w, h)] = table.reshape(h, w, 2)
+        return table
+
+    def map(self, points, w, h):
+        """(n, 2) camera px -> (n, 2) screen px via the remap table"""
+        points = np.asarray(points, dtype=np.float32)
+        xs = np.clip(np.rint(points[:, 0]).astype(np.intp), 0, w - 1)
+        ys = np.clip(np.rint(points[:, 1]).astype(np.intp), 0, h - 1)
+        return self.table(w, h)[ys, xs]
+
+
+class CalibrationSession:
+    """Steps through CALIBRATION_POINTS collecting camera/screen correspondences"""
+
+    def __init__(self, points=CALIBRATION_POINTS):
+        self.points = list(points)
+        self.step = 0
+        self.camera_points = []
+        self.screen_points = []
+        self.screen_point = None      # screen px of the current dot, reported by the page
+        self.screen_size = None       # page (w, h) in screen px, reported with each dot
+        self.capture_requested = False
+
+    @property
+    def done(self):
+        return self.step >= len(self.points)
+
+    def current(self):
+        """The dot to project: {'step', 'points', 'x', 'y'} (normalized screen)"""
+        x, y = self.points[self.step]
+        return {'step': self.step, 'points': len(self.points), 'x': x, 'y': y}
+
+    def record(self, camera_point):
+        self.camera_points.append(camera_point)
+        self.screen_points.append(self.screen_point)
+        self.screen_point = None
+        self.step += 1
+
+    def solve(self, frame_size):
+        return Calibration.from_points(self.camera_points, self.screen_points, frame_size, self.screen_size)
@@ -0,0 +1,90 @@
+"""
+Preallocated frame ring
+
+Capture writes each frame straight into a free slot (cap.read(image=...),
+cv2.flip(dst=...)), and inference, button detection and preview all read
+that same array. A slot is pinned while a FramePacket holds it and returned
+to the ring when the packet is released (last stage done, or dropped by a
+latest-frame-wins queue), so steady-state allocation per frame is ~zero.
+
+With shared=True the slots live in one multiprocessing.shared_memory block
+so other processes can map them by name (see attach()): the process
+inference backend reads a pinned slot in place instead of receiving a copy.
+"""
+
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class FrameRing:
+    """Fixed pool of equally-shaped uint8 frame buffers"""
+
+    def __init__(self, shape, slots=8, shared=False):
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.shared = shared
+        self.shm = None
+        frame_bytes = int(np.prod(self.shape))
+        if shared:
+            self.shm = shared_memory.SharedMemory(create=True, size=frame_bytes * slots)
+            block = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=self.shm.buf)
+        else:
+            block = np.empty((slots,) + self.shape, dtype=np.uint8)
+        self.buffers = [block[i] for i in range(slots)]
+        self._pins = [0] * slots
+        self._next = 0
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.overflows = 0
+
+    @property
+    def shm_name(self):
+        return self.shm.name if self.shm else None
+
+    def acquire(self):
+        """(slot, array) for the next unpinned buffer; slot is None on overflow"""
+        with self._lock:
+            for i in range(self.slots):
+                slot = (self._next + i) % self.slots
+                if self._pins[slot] == 0:
+                    self._pins[slot] = 1
+                    self._next = (slot + 1) % self.slots
+                    self.acquired += 1
+                    return slot, self.buffers[slot]
+            # Every slot is still in flight: hand out a temporary array
+            self.overflows += 1
+        return None, np.empty(self.shape, dtype=np.uint8)
+
+    def release(self, slot):
+        if slot is None:
+            return
+        with self._lock:
+            if self._pins[slot] > 0:
+                self._pins[slot] -= 1
+
+    def in_use(self):
+        with self._lock:
+            return sum(1 for pin in self._pins if pin)
+
+    def snapshot(self):
+        return {'slots': self.slots, 'in_use': self.in_use(), 'acquired': self.acquired,
+                'overflows': self.overflows, 'shared': self.shared}
+
+    @staticmethod
+    def attach(name, shape):
+        """Map another process's shared ring: (SharedMemory, (slots,) + shape array)"""
+        shm = shared_memory.SharedMemory(name=name)
+        slots = shm.size // int(np.prod(shape))
+        return shm, np.ndarray((slots,) + tuple(shape), dtype=np.uint8, buffer=shm.buf)
+
+    def close(self):
+        self.buffers = []
+        if self.shm is not None:
+            try:
+                self.shm.close()
+            except BufferError:
+                pass    # a packet still references a slot; the mapping goes with the process
+            self.shm.unlink()
+            self.shm = None
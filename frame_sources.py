@@ -0,0 +1,335 @@
+"""
+Frame sources for the Vision Engine
+
+Every source mimics the small part of cv2.VideoCapture the engine uses
+(read / isOpened / release), so a camera, a video file or a folder of
+images can be swapped in without touching the pipeline. Like
+VideoCapture.read, read() accepts an output array to decode into.
+
+Cameras negotiate fourcc / resolution / FPS / driver buffer size, stamp
+each frame with the monotonic time grab() returned (`last_timestamp`),
+and can grab on a dedicated reader thread that only ever exposes the
+newest frame. To compare a camera's modes:
+
+    python3 frame_sources.py --probe 0
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.bmp')
+
+
+class LatestFrameReader:
+    """
+    Grabs continuously on its own thread into a back buffer and swaps it
+    with the published frame, so read() never returns a stale, queued frame.
+    Frames decoded but superseded before anyone read them count as dropped.
+    """
+
+    def __init__(self, grab, name='capture'):
+        self.grab = grab            # grab(image) -> (ret, frame, timestamp)
+        self.frames = 0
+        self.dropped = 0
+        self.running = True
+        self._latest = None         # (frame, timestamp)
+        self._back = None
+        self._seq = 0
+        self._consumed = 0
+        self._failed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._loop, name=f"reader-{name}", daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while self.running:
+            ret, frame, timestamp = self.grab(self._back)
+            with self._cond:
+                if not ret:
+                    self._failed = True
+                    self._cond.notify_all()
+                    return
+                if self._seq > self._consumed:
+                    self.dropped += 1
+                # Publish the new frame; the previous one becomes the next decode target
+                previous = self._latest[0] if self._latest else None
+                self._latest = (frame, timestamp)
+                self._back = previous
+                self._seq += 1
+                self.frames += 1
+                self._cond.notify_all()
+
+    def read(self, image=None):
+        """Newest frame not returned before: (ret, frame, timestamp)"""
+        with self._cond:
+            while self._seq == self._consumed and not self._failed and self.running:
+                self._cond.wait(1.0)
+            if self._seq == self._consumed:
+                return False, None, None
+            frame, timestamp = self._latest
+            self._consumed = self._seq
+            if image is not None and image.shape == frame.shape:
+                np.copyto(image, frame)
+                return True, image, timestamp
+            return True, frame.copy(), timestamp
+
+    def stop(self):
+        self.running = False
+        self._thread.join(timeout=1.0)
+
+
+def fourcc_name(code):
+    code = int(code)
+    return ''.join(chr((code >> 8 * i) & 0xFF) for i in range(4)).strip('\x00')
+
+
+class CameraSource:
+    """Live webcam by index, opened in a negotiated capture mode"""
+
+    def __init__(self, index=0, fourcc=None, width=None, height=None, fps=None,
+                 buffer_size=1, threaded=False):
+        self.name = f"camera:{index}"
+        self.cap = cv2.VideoCapture(index)
+        self.last_timestamp = None  # monotonic time the last frame was grabbed
+        self.reader = None
+        if not self.cap.isOpened():
+            # Nothing to negotiate: get() on a closed capture returns zeros, not a mode
+            self.mode = {}
+            return
+        # Order matters on V4L2: pixel format before size before rate
+        if fourcc:
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        if width and height:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        if fps:
+            self.cap.set(cv2.CAP_PROP_FPS, fps)
+        if buffer_size:
+            # Fewer driver buffers = fewer stale frames queued ahead of us
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+        self.mode = self.negotiated()
+        if threaded:
+            self.reader = LatestFrameReader(self._grab, self.name)
+
+    def negotiated(self):
+        """The mode the driver actually accepted"""
+        return {
+            'fourcc': fourcc_name(self.cap.get(cv2.CAP_PROP_FOURCC)),
+            'width': int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            'height': int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            'fps': round(self.cap.get(cv2.CAP_PROP_FPS), 2),
+            'buffer_size': int(self.cap.get(cv2.CAP_PROP_BUFFERSIZE)),
+        }
+
+    def _grab(self, image=None):
+        # Stamp when the frame arrives, before the (possibly MJPG) decode
+        if not self.cap.grab():
+            return False, None, None
+        timestamp = time.monotonic()
+        ret, frame = self.cap.retrieve(image)
+        return ret, frame, timestamp
+
+    def read(self, image=None):
+        if self.reader is not None:
+            ret, frame, timestamp = self.reader.read(image)
+        else:
+            ret, frame, timestamp = self._grab(image)
+        self.last_timestamp = timestamp
+        return ret, frame
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def snapshot(self):
+        snapshot = dict(self.mode)
+        if self.reader is not None:
+            snapshot.update(frames=self.reader.frames, dropped=self.reader.dropped)
+        return snapshot
+
+    def release(self):
+        if self.reader is not None:
+            self.reader.stop()
+        self.cap.release()
+
+
+class VideoFileSource:
+    """Video file, optionally looped `loops` times (0 = forever)"""
+
+    def __init__(self, path, loops=1):
+        self.name = f"video:{path}"
+        self.path = str(path)
+        self.loops = loops
+        self._pass = 1
+        self.cap = cv2.VideoCapture(self.path)
+
+    def read(self, image=None):
+        ret, frame = self.cap.read(image)
+        if not ret and (self.loops == 0 or self._pass < self.loops):
+            self._pass += 1
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read(image)
+        return ret, frame
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirSource:
+    """Still images from a directory, played in name order"""
+
+    def __init__(self, path, loops=1):
+        self.name = f"images:{path}"
+        self.loops = loops
+        self.frames = []
+        for image_path in sorted(Path(path).iterdir()):
+            if image_path.suffix.lower() in IMAGE_EXTENSIONS:
+                image = cv2.imread(str(image_path))
+                if image is not None:
+                    self.frames.append(image)
+        self._index = 0
+
+    def read(self, image=None):
+        if not self.frames:
+            return False, None
+        total = len(self.frames) * self.loops
+        if self.loops and self._index >= total:
+            return False, None
+        frame = self.frames[self._index % len(self.frames)]
+        self._index += 1
+        # Hand out a copy so in-place drawing never corrupts the cache
+        if image is not None and image.shape == frame.shape:
+            np.copyto(image, frame)
+            return True, image
+        return True, frame.copy()
+
+    def isOpened(self):
+        return bool(self.frames)
+
+    def release(self):
+        self.frames = []
+
+
+class SyntheticSource:
+    """
+    Generated frames paced to a fixed rate: a cyan button on a dark
+    background and a pale blob circling it. Needs no camera or files, and
+    every run produces the same frames (load tests, CI).
+    """
+
+    def __init__(self, width=1280, height=720, fps=30.0):
+        self.name = f"synthetic:{width}x{height}@{fps:g}"
+        self.fps = fps
+        self.base = np.full((height, width, 3), 40, dtype=np.uint8)
+        self.center = (width // 2, height // 2)
+        cv2.circle(self.base, self.center, 60, (255, 255, 0), -1)     # BGR cyan
+        self._index = 0
+        self._next = None
+
+    def read(self, image=None):
+        now = time.monotonic()
+        if self._next is None or now - self._next > 1.0 / self.fps:
+            self._next = now    # fell behind: restart the schedule instead of bursting
+        elif self._next > now:
+            time.sleep(self._next - now)
+        self._next += 1.0 / self.fps
+        if image is None or image.shape != self.base.shape:
+            image = np.empty_like(self.base)
+        np.copyto(image, self.base)
+        angle = 2 * np.pi * (self._index % 120) / 120
+        x = int(self.center[0] + 200 * np.cos(angle))
+        y = int(self.center[1] + 200 * np.sin(angle))
+        cv2.circle(image, (x, y), 40, (200, 210, 230), -1)
+        self._index += 1
+        return True, image
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        pass
+
+
+def parse_synthetic(spec):
+    """'synthetic[:WxH][@FPS]' -> SyntheticSource kwargs"""
+    options = {}
+    rest = spec[len('synthetic'):].lstrip(':')
+    rest, _, fps = rest.partition('@')
+    if fps:
+        options['fps'] = float(fps)
+    if rest:
+        width, height = rest.lower().split('x')
+        options['width'], options['height'] = int(width), int(height)
+    return options
+
+
+def open_source(spec, loops=1, **camera_options):
+    """
+    Build a frame source from a CLI-style spec:
+    an integer camera index, a video file path, an image directory or
+    'synthetic[:WxH][@FPS]' for generated frames.
+    camera_options (fourcc, width, height, fps, buffer_size, threaded) apply to cameras.
+    """
+    if isinstance(spec, int) or str(spec).isdigit():
+        return CameraSource(int(spec), **camera_options)
+    if str(spec).startswith('synthetic'):
+        return SyntheticSource(**parse_synthetic(str(spec)))
+    if os.path.isdir(spec):
+        return ImageDirSource(spec, loops=loops)
+    if os.path.isfile(spec):
+        return VideoFileSource(spec, loops=loops)
+    raise ValueError(f"Unknown frame source: {spec}")
+
+
+PROBE_MODES = [
+    (fourcc, width, height, fps)
+    for fourcc in ('MJPG', 'YUYV')
+    for width, height in ((640, 480), (1280, 720), (1920, 1080))
+    for fps in (30, 60)
+]
+
+
+def probe(index, seconds=2.0, modes=PROBE_MODES):
+    """Open each mode, read for `seconds`, report what was negotiated and delivered"""
+    report = []
+    for fourcc, width, height, fps in modes:
+        source = CameraSource(index, fourcc, width, height, fps)
+        if not source.isOpened():
+            source.release()
+            continue
+        frames, decode = 0, 0.0
+        t0 = time.monotonic()
+        while time.monotonic() - t0 < seconds:
+            ret, _ = source.read()
+            if not ret:
+                break
+            # Time from grab() returning to the decoded frame: this mode's decode cost
+            decode += time.monotonic() - source.last_timestamp
+            frames += 1
+        elapsed = time.monotonic() - t0
+        report.append({
+            'requested': {'fourcc': fourcc, 'width': width, 'height': height, 'fps': fps},
+            'negotiated': source.mode,
+            'delivered_fps': round(frames / elapsed, 1) if elapsed else 0.0,
+            'decode_ms': round(decode / frames * 1000.0, 2) if frames else None,
+        })
+        source.release()
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Frame source tools")
+    parser.add_argument('--probe', type=int, metavar='INDEX', required=True,
+                        help="try common fourcc/resolution/FPS modes on a camera")
+    parser.add_argument('--seconds', type=float, default=2.0, help="capture time per mode")
+    args = parser.parse_args()
+    print(json.dumps(probe(args.probe, args.seconds), indent=2))
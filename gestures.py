@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Vectorized hand landmarks and gesture classification
+
+MediaPipe results are converted once per frame into a contiguous float32
+array of shape (hands, 21, 3) (normalized x, y, z). Every rule below works on
+any leading batch shape, e.g. (hands, 21, 3) for one frame or
+(frames, hands, 21, 3) for a whole recording, so offline tuning can score
+hours of landmarks in one call.
+
+    python3 gestures.py --bench 100000     # synthetic scoring throughput
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+# MediaPipe hand landmark indices
+WRIST = 0
+THUMB_CMC, THUMB_MCP, THUMB_IP, THUMB_TIP = 1, 2, 3, 4
+INDEX_MCP, INDEX_PIP, INDEX_DIP, INDEX_TIP = 5, 6, 7, 8
+MIDDLE_MCP, MIDDLE_PIP, MIDDLE_DIP, MIDDLE_TIP = 9, 10, 11, 12
+RING_MCP, RING_PIP, RING_DIP, RING_TIP = 13, 14, 15, 16
+PINKY_MCP, PINKY_PIP, PINKY_DIP, PINKY_TIP = 17, 18, 19, 20
+
+FINGER_TIPS = np.array([INDEX_TIP, MIDDLE_TIP, RING_TIP, PINKY_TIP])
+FINGER_PIPS = np.array([INDEX_PIP, MIDDLE_PIP, RING_PIP, PINKY_PIP])
+
+GESTURES = ('thumbs_up', 'pointing', 'open_palm', 'fist', 'pinch')
+THRESHOLDS = {name: 0.7 for name in GESTURES}
+
+# Thumb-index distance, relative to palm size, that counts as a full pinch
+PINCH_RATIO = 0.5
+
+
+# --- LANDMARK LAYER ---
+def landmarks_to_array(results):
+    """(hands, 21, 3) float32 array from a MediaPipe Hands result (or landmark list)"""
+    if results is None:
+        return np.empty((0, 21, 3), dtype=np.float32)
+    cached = getattr(results, 'landmark_array', None)
+    if cached is not None:
+        return cached
+    hands = getattr(results, 'multi_hand_landmarks', results) or []
+    out = np.empty((len(hands), 21, 3), dtype=np.float32)
+    for i, hand in enumerate(hands):
+        out[i] = [(lm.x, lm.y, lm.z) for lm in hand.landmark]
+    return out
+
+
+def to_pixels(landmarks, w, h, index=INDEX_TIP):
+    """(..., 2) pixel coordinates of one landmark (default: index fingertip)"""
+    return landmarks[..., index, :2] * np.array([w, h], dtype=np.float32)
+
+
+def _dist(landmarks, a, b):
+    return np.linalg.norm(landmarks[..., a, :2] - landmarks[..., b, :2], axis=-1)
+
+
+# --- FEATURES ---
+def fingers_curled_y(landmarks):
+    """(..., 4) index..pinky tips below their PIP joints (image y grows downward)"""
+    return landmarks[..., FINGER_TIPS, 1] > landmarks[..., FINGER_PIPS, 1]
+
+
+def fingers_extended(landmarks):
+    """(..., 4) index..pinky tips farther from the wrist than their PIP joints"""
+    wrist = landmarks[..., WRIST:WRIST + 1, :2]
+    tip_d = np.linalg.norm(landmarks[..., FINGER_TIPS, :2] - wrist, axis=-1)
+    pip_d = np.linalg.norm(landmarks[..., FINGER_PIPS, :2] - wrist, axis=-1)
+    return tip_d > pip_d
+
+
+def thumb_extended(landmarks):
+    """(...,) thumb tip farther from the index MCP than the thumb IP joint"""
+    return _dist(landmarks, THUMB_TIP, INDEX_MCP) > _dist(landmarks, THUMB_IP, INDEX_MCP)
+
+
+def palm_size(landmarks):
+    return np.maximum(_dist(landmarks, WRIST, MIDDLE_MCP), 1e-6)
+
+
+# --- GESTURE SCORES (all in [0, 1]) ---
+def thumbs_up(landmarks):
+    """Same rule as PositivityBoostApp: 0.4 thumb up + 0.15 per curled finger"""
+    y = landmarks[..., 1]
+    thumb_up = (y[..., THUMB_TIP] < y[..., THUMB_IP]) & (y[..., THUMB_IP] < y[..., THUMB_MCP])
+    return 0.4 * thumb_up + 0.15 * fingers_curled_y(landmarks).sum(axis=-1)
+
+
+def pointing(landmarks):
+    ext = fingers_extended(landmarks)
+    return 0.4 * ext[..., 0] + 0.2 * (~ext[..., 1:]).sum(axis=-1)
+
+
+def open_palm(landmarks):
+    return 0.2 * (fingers_extended(landmarks).sum(axis=-1) + thumb_extended(landmarks))
+
+
+def fist(landmarks):
+    return 0.2 * ((~fingers_extended(landmarks)).sum(axis=-1) + ~thumb_extended(landmarks))
+
+
+def pinch(landmarks):
+    ratio = _dist(landmarks, THUMB_TIP, INDEX_TIP) / palm_size(landmarks)
+    return np.clip(1.0 - ratio / PINCH_RATIO, 0.0, 1.0)
+
+
+RULES = {
+    'thumbs_up': thumbs_up,
+    'pointing': pointing,
+    'open_palm': open_palm,
+    'fist': fist,
+    'pinch': pinch,
+}
+
+
+def score(landmarks, gestures=GESTURES):
+    """(..., len(gestures)) float32 scores; NaN landmarks (missing hands) score 0"""
+    landmarks = np.asarray(landmarks, dtype=np.float32)
+    # NaN compares False, so the boolean rules alone would score an absent hand as a fist
+    valid = ~np.isnan(landmarks).any(axis=(-2, -1))
+    scores = np.stack([RULES[name](landmarks) for name in gestures], axis=-1)
+    return np.nan_to_num(scores.astype(np.float32), nan=0.0) * valid[..., None]
+
+
+def classify(landmarks, gestures=GESTURES, thresholds=None):
+    """(..., len(gestures)) bool: score at or above each gesture's threshold"""
+    thresholds = thresholds or THRESHOLDS
+    limits = np.array([thresholds[name] for name in gestures], dtype=np.float32)
+    return score(landmarks, gestures) >= limits
+
+
+def score_sequence(landmarks, gestures=GESTURES, thresholds=None):
+    """
+    Bulk scoring for recorded sessions: landmarks is (frames, hands, 21, 3)
+    with NaN for absent hands. Returns per-frame best scores (frames, gestures)
+    and how many frames each gesture fired in.
+    """
+    scores = score(landmarks, gestures).max(axis=-2)
+    fired = classify(landmarks, gestures, thresholds).any(axis=-2)
+    return scores, dict(zip(gestures, fired.sum(axis=0).tolist()))
+
+
+def _bench(frames, hands=2):
+    rng = np.random.default_rng(0)
+    landmarks = rng.random((frames, hands, 21, 3), dtype=np.float32)
+    t0 = time.perf_counter()
+    scores, counts = score_sequence(landmarks)
+    elapsed = time.perf_counter() - t0
+    print(f"Scored {frames} frames x {hands} hands x {len(GESTURES)} gestures "
+          f"in {elapsed * 1000:.1f} ms ({frames / elapsed:,.0f} frames/s)")
+    print(f"Fired: {counts}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gesture classifier throughput")
+    parser.add_argument('--bench', type=int, default=100000, metavar='FRAMES')
+    args = parser.parse_args()
+    _bench(args.bench)
@@ -0,0 +1,218 @@
+"""
+Process-pool MediaPipe backend
+
+Runs mp_hands.Hands in worker processes so hand inference never competes
+with the Socket.IO server for the GIL / eventlet hub. Frames are written
+into a per-worker shared-memory buffer (no pickling of images); workers send
+back compact float32 landmark arrays of shape (hands, 21, 3).
+
+Frames captured into a shared FrameRing (--shared-ring) skip that copy:
+process_slot() sends only the ring's name and slot index, and the worker
+maps the ring and crops, scales and converts the pinned slot itself.
+
+Each stream (station) is pinned to one worker and keeps its own graph
+there, so MediaPipe's tracking state stays per camera.
+"""
+
+import multiprocessing as mp
+import threading
+import types
+from multiprocessing import shared_memory
+
+import numpy as np
+
+DEFAULT_MAX_SHAPE = (1080, 1920, 3)
+
+
+def _landmarks(results):
+    hands = results.multi_hand_landmarks or []
+    landmarks = np.array(
+        [[(lm.x, lm.y, lm.z) for lm in hand.landmark] for hand in hands],
+        dtype=np.float32).reshape(len(hands), 21, 3)
+    scores = [c.classification[0].score for c in (results.multi_handedness or [])]
+    return ('result', landmarks, scores)
+
+
+def _slot_image(frame, roi, scale):
+    """BGR ring slot -> RGB inference input, as VisionEngine.detect_hands prepares it"""
+    import cv2
+
+    if roi is not None:
+        frame = frame[roi[1]:roi[3], roi[0]:roi[2]]
+    if scale != 1.0:
+        h, w = frame.shape[:2]
+        frame = cv2.resize(frame, (max(int(w * scale), 1), max(int(h * scale), 1)),
+                           interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+
+def _worker_main(shm_name, max_shape, conn):
+    import mediapipe
+
+    from frame_ring import FrameRing
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    buf = np.ndarray(int(np.prod(max_shape)), dtype=np.uint8, buffer=shm.buf)
+    graphs = {}
+    rings = {}      # shm name -> (SharedMemory, slots array) of attached frame rings
+    conn.send(('ready',))
+    try:
+        while True:
+            msg = conn.recv()
+            if msg is None:
+                break
+            cmd, stream_id = msg[0], msg[1]
+            if cmd == 'open':
+                if stream_id in graphs:
+                    graphs[stream_id].close()
+                graphs[stream_id] = mediapipe.solutions.hands.Hands(**msg[2])
+                conn.send(('ok',))
+            elif cmd == 'close':
+                graph = graphs.pop(stream_id, None)
+                if graph is not None:
+                    graph.close()
+                conn.send(('ok',))
+            elif cmd == 'process':
+                h, w = msg[2]
+                # Frames are packed contiguously at the start of the buffer
+                results = graphs[stream_id].process(buf[:h * w * 3].reshape(h, w, 3))
+                conn.send(_landmarks(results))
+            elif cmd == 'process_slot':
+                ring_name, slot, shape, roi, scale = msg[2:]
+                if ring_name not in rings:
+                    # A station re-creates its ring when the frame size changes
+                    for stale in [n for n, (_, _, s) in rings.items() if s == stream_id]:
+                        _close_ring(*rings.pop(stale)[:2])
+                    rings[ring_name] = FrameRing.attach(ring_name, shape) + (stream_id,)
+                frame = rings[ring_name][1][slot]
+                results = graphs[stream_id].process(_slot_image(frame, roi, scale))
+                del frame
+                conn.send(_landmarks(results))
+    finally:
+        for graph in graphs.values():
+            graph.close()
+        for ring_shm, slots, _ in rings.values():
+            _close_ring(ring_shm, slots)
+        del buf
+        shm.close()
+
+
+def _close_ring(shm, slots):
+    del slots
+    try:
+        shm.close()     # the engine owns (and unlinks) the ring
+    except BufferError:
+        pass
+
+
+class _Worker:
+    """One inference process plus its shared frame buffer"""
+
+    def __init__(self, ctx, index, max_shape):
+        self.index = index
+        self.max_shape = max_shape
+        self.shm = shared_memory.SharedMemory(create=True, size=int(np.prod(max_shape)))
+        self.buffer = np.ndarray(self.shm.size, dtype=np.uint8, buffer=self.shm.buf)
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, name=f"hands-worker-{index}",
+                                   args=(self.shm.name, max_shape, child_conn), daemon=True)
+        self.process.start()
+        self.lock = threading.Lock()
+        self._expect('ready')
+
+    def _expect(self, kind):
+        try:
+            reply = self.conn.recv()
+        except EOFError:
+            raise RuntimeError(f"hands worker {self.index} died") from None
+        if reply[0] != kind:
+            raise RuntimeError(f"hands worker {self.index}: unexpected reply {reply[0]!r}")
+        return reply
+
+    def call(self, msg, kind='ok'):
+        with self.lock:
+            self.conn.send(msg)
+            return self._expect(kind)
+
+    def process_frame(self, stream_id, rgb):
+        h, w = rgb.shape[:2]
+        if h > self.max_shape[0] or w > self.max_shape[1]:
+            raise ValueError(f"frame {w}x{h} exceeds shared buffer {self.max_shape[1]}x{self.max_shape[0]}")
+        with self.lock:
+            self.buffer[:h * w * 3].reshape(h, w, 3)[...] = rgb
+            self.conn.send(('process', stream_id, (h, w)))
+            return self._expect('result')
+
+    def close(self):
+        try:
+            with self.lock:
+                self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=2.0)
+        if self.process.is_alive():
+            self.process.terminate()
+        del self.buffer
+        self.shm.close()
+        self.shm.unlink()
+
+
+class HandsSession:
+    """Drop-in for mp_hands.Hands backed by a worker process"""
+
+    def __init__(self, worker, stream_id, options):
+        self.worker = worker
+        self.stream_id = stream_id
+        self.worker.call(('open', stream_id, options))
+
+    def process(self, rgb):
+        _, landmarks, scores = self.worker.process_frame(self.stream_id, rgb)
+        return landmarks_to_results(landmarks, scores)
+
+    def process_slot(self, ring_name, slot, shape, roi=None, scale=1.0):
+        """Like process(), on a pinned BGR slot of a shared FrameRing the worker reads in place"""
+        _, landmarks, scores = self.worker.call(
+            ('process_slot', self.stream_id, ring_name, slot, tuple(shape), roi, scale), 'result')
+        return landmarks_to_results(landmarks, scores)
+
+    def close(self):
+        self.worker.call(('close', self.stream_id))
+
+
+class ProcessHandsBackend:
+    """Pool of MediaPipe worker processes"""
+
+    def __init__(self, workers=1, max_shape=DEFAULT_MAX_SHAPE):
+        # spawn: never fork a process that already has threads / an eventlet hub
+        ctx = mp.get_context('spawn')
+        self.workers = [_Worker(ctx, i, max_shape) for i in range(workers)]
+        self._streams = 0
+
+    def session(self, **options):
+        """New per-stream Hands graph, pinned round-robin to a worker"""
+        stream_id = self._streams
+        self._streams += 1
+        worker = self.workers[stream_id % len(self.workers)]
+        return HandsSession(worker, stream_id, options)
+
+    def close(self):
+        for worker in self.workers:
+            worker.close()
+
+
+def landmarks_to_results(landmarks, scores=()):
+    """Wrap a (hands, 21, 3) array in the shape of a MediaPipe Hands result"""
+    from mediapipe.framework.formats import landmark_pb2
+
+    hands = []
+    for hand in landmarks:
+        proto = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z in hand.tolist():
+            proto.landmark.add(x=x, y=y, z=z)
+        hands.append(proto)
+    return types.SimpleNamespace(
+        multi_hand_landmarks=hands or None,
+        multi_handedness=None,
+        landmark_array=landmarks,
+        handedness_scores=list(scores),
+    )
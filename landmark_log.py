@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Landmark record / replay
+
+The engine (--record FILE) appends one fixed-size binary record per frame:
+capture timestamp, hand landmarks, detected button, locked target and the
+events it emitted. Files are a 16-byte header followed by a flat array of
+RECORD_DTYPE, so they can be np.memmap'ed and sliced without parsing.
+
+Replay feeds the recorded landmarks through the same trigger code the
+engine uses (triggers.py) without running MediaPipe or a camera:
+
+    python3 landmark_log.py info session.vlog
+    python3 landmark_log.py replay session.vlog --radius 80 --debounce 1.5
+    python3 landmark_log.py replay session.vlog --hold thumbs_up --required-frames 8
+"""
+
+import argparse
+import json
+import struct
+import time
+
+import numpy as np
+
+import gestures
+from smoothing import HandSmoother
+from triggers import HoldTrigger, ProximityTrigger
+
+MAGIC = b'VLOG'
+VERSION = 1
+MAX_HANDS = 2
+HEADER = struct.Struct('<4sHHII')   # magic, version, max_hands, record size, reserved
+
+EVENT_BITS = {'click': 1}
+
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<f8'),                       # monotonic capture time, seconds
+    ('seq', '<u4'),
+    ('width', '<u2'),
+    ('height', '<u2'),
+    ('hands', 'u1'),
+    ('events', 'u1'),                           # EVENT_BITS mask
+    ('interpolated', 'u1'),
+    ('landmarks', '<f4', (MAX_HANDS, 21, 3)),   # normalized, NaN for absent hands
+    ('button', '<f4', (3,)),                    # x, y, radius px (NaN if not scanned)
+    ('target', '<f4', (2,)),                    # locked target px (NaN if none)
+])
+
+
+class LandmarkRecorder:
+    """Append-only writer for one engine's frame stream"""
+
+    def __init__(self, path):
+        self.path = path
+        self.frames = 0
+        self._record = np.zeros(1, dtype=RECORD_DTYPE)
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION, MAX_HANDS, RECORD_DTYPE.itemsize, 0))
+        print(f"⏺️  Recording landmarks to {path}")
+
+    def write(self, packet, target=None):
+        rec = self._record[0]
+        h, w = packet.frame.shape[:2]
+        rec['timestamp'] = packet.timestamp
+        rec['seq'] = packet.seq
+        rec['width'], rec['height'] = w, h
+        rec['events'] = sum(EVENT_BITS.get(e, 0) for e in packet.events)
+        rec['interpolated'] = packet.interpolated
+
+        rec['landmarks'] = np.nan
+        landmarks = packet.landmark_array
+        if packet.interpolated and len(packet.tips):
+            # Only the extrapolated fingertip exists on skipped frames
+            n = min(len(packet.tips), MAX_HANDS)
+            rec['landmarks'][:n, gestures.INDEX_TIP, :2] = np.asarray(packet.tips[:n]) / (w, h)
+            rec['hands'] = n
+        elif landmarks is not None:
+            n = min(len(landmarks), MAX_HANDS)
+            rec['landmarks'][:n] = landmarks[:n]
+            rec['hands'] = n
+        else:
+            rec['hands'] = 0
+
+        button = packet.button
+        rec['button'] = (button[0][0], button[0][1], button[1]) if button else np.nan
+        rec['target'] = target if target else np.nan
+        self._file.write(self._record.tobytes())
+        self.frames += 1
+
+    def close(self):
+        self._file.close()
+        print(f"⏹️  Recorded {self.frames} frames to {self.path}")
+
+
+def load(path):
+    """Memory-map a recording as a structured array of RECORD_DTYPE"""
+    with open(path, 'rb') as f:
+        magic, version, max_hands, size, _ = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path}: not a v{VERSION} landmark log")
+    if max_hands != MAX_HANDS or size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"{path}: record layout mismatch")
+    return np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER.size)
+
+
+def replay_proximity(records, radius=90.0, debounce=2.0, release_radius=None, smooth=False):
+    """Run ProximityTrigger (optionally behind HandSmoother); returns per-frame fired flags"""
+    trigger = ProximityTrigger(radius=radius, debounce=debounce, release_radius=release_radius)
+    smoother = HandSmoother() if smooth else None
+    # Fingertips for every frame in one vectorized pass
+    size = np.stack([records['width'], records['height']], axis=-1).astype(np.float32)
+    tips = gestures.to_pixels(records['landmarks'], 1, 1) * size[:, None, :]
+    fired = np.zeros(len(records), dtype=bool)
+    hands = records['hands']
+    targets = records['target']
+    timestamps = records['timestamp']
+    for i in range(len(records)):
+        target = targets[i]
+        if hands[i] == 0 or np.isnan(target[0]):
+            trigger.update((), None, timestamps[i])     # leaves the zone, like the live engine
+            continue
+        frame_tips = tips[i, :hands[i]]
+        if smoother is not None and not records['interpolated'][i]:
+            smoothed = smoother.update(records['landmarks'][i, :hands[i]],
+                                       records['width'][i], records['height'][i], timestamps[i])
+            # No live clock offline: predict to capture time (zero lookahead)
+            frame_tips = smoother.predict_tips(smoothed, timestamps[i], timestamps[i])
+        _, hit = trigger.update(frame_tips, target, timestamps[i])
+        fired[i] = hit is not None
+    return fired
+
+
+def replay_hold(records, gesture='thumbs_up', required_frames=10, threshold=None):
+    """Run HoldTrigger (PositivityBoostApp's required_frames rule) over a recording"""
+    threshold = gestures.THRESHOLDS[gesture] if threshold is None else threshold
+    scores = gestures.score(records['landmarks'], (gesture,))[..., 0].max(axis=-1)
+    trigger = HoldTrigger(required_frames)
+    held = np.fromiter((trigger.update(s >= threshold) for s in scores), dtype=bool, count=len(scores))
+    return held, trigger.fired
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Landmark log tools")
+    sub = parser.add_subparsers(dest='command', required=True)
+    info = sub.add_parser('info', help="summarize a recording")
+    info.add_argument('path')
+    rep = sub.add_parser('replay', help="replay trigger logic over a recording")
+    rep.add_argument('path')
+    rep.add_argument('--radius', type=float, default=90.0)
+    rep.add_argument('--debounce', type=float, default=2.0)
+    rep.add_argument('--release-radius', type=float, help="trigger hysteresis (default: --radius)")
+    rep.add_argument('--smooth', action='store_true', help="replay through HandSmoother")
+    rep.add_argument('--hold', choices=gestures.GESTURES,
+                     help="replay a gesture-hold trigger instead of the proximity trigger")
+    rep.add_argument('--required-frames', type=int, default=10)
+    rep.add_argument('--threshold', type=float)
+    args = parser.parse_args()
+
+    records = load(args.path)
+    duration = float(records['timestamp'][-1] - records['timestamp'][0]) if len(records) > 1 else 0.0
+    recorded = (records['events'] & EVENT_BITS['click']) > 0
+    summary = {
+        'frames': len(records),
+        'duration_s': round(duration, 2),
+        'frames_with_hands': int((records['hands'] > 0).sum()),
+        'recorded_clicks': int(recorded.sum()),
+    }
+
+    if args.command == 'replay':
+        t0 = time.perf_counter()
+        if args.hold:
+            held, fired = replay_hold(records, args.hold, args.required_frames, args.threshold)
+            summary.update({'gesture': args.hold, 'held_frames': int(held.sum()), 'holds': fired})
+        else:
+            fired = replay_proximity(records, args.radius, args.debounce,
+                                     args.release_radius, args.smooth)
+            summary.update({
+                'replayed_clicks': int(fired.sum()),
+                'mismatched_frames': int((fired != recorded).sum()),
+            })
+        elapsed = time.perf_counter() - t0
+        summary['replay_s'] = round(elapsed, 4)
+        summary['speedup'] = round(duration / elapsed, 1) if elapsed and duration else None
+
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Socket.IO fan-out load test
+
+Starts the engine on a synthetic (or replayed) source with --tick, so it
+broadcasts a small 'tick' {seq, n, captured} on every frame through the
+same emit path as 'click'; n numbers the ticks 1, 2, ... in step with the
+engine's vision_events_total{event="tick"}. Simulated projector clients then connect in steps
+of increasing size, spread over a few client processes so the clients
+themselves are not the bottleneck. Per step it reports:
+
+    connect_ms   time for each client's Socket.IO connect
+    latency_ms   frame capture -> tick received, over all clients
+    loss         share of the ticks the engine emitted in the window that a
+                 client never received
+    fps          engine trigger-stage FPS, and its ratio to the 0-client step
+
+    python3 loadtest.py --clients 0,50,100,200
+    python3 loadtest.py --async --clients 0,100 --max-p95-ms 150 --max-loss 0.001
+
+With --max-* / --min-* gates the exit status is 1 when any step fails
+one, so a run can gate a release. The default synthetic source is paced
+at a fixed rate and identical on every run.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+import socketio
+
+from benchmark import scratch_files, summarize, wait_ready
+
+ROOT = Path(__file__).parent
+METRIC_LINE = re.compile(r'^(\w+)\{([^}]*)\} (\S+)$')
+
+
+def scrape(port):
+    """/metrics as {(name, frozenset(labels)): value}"""
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=2.0) as response:
+        text = response.read().decode()
+    samples = {}
+    for line in text.splitlines():
+        match = METRIC_LINE.match(line)
+        if match:
+            name, labels, value = match.groups()
+            samples[(name, frozenset(re.findall(r'(\w+)="([^"]*)"', labels)))] = float(value)
+    return samples
+
+
+def metric(samples, name, **labels):
+    return samples.get((name, frozenset(labels.items())), 0.0)
+
+
+async def run_clients(url, count, connected, stop, grace):
+    clients, connect, received = [], [], []
+
+    for _ in range(count):
+        client = socketio.AsyncClient(reconnection=False)
+        ticks = []
+
+        def on_tick(data, ticks=ticks):
+            ticks.append((data['n'], time.time(), data['captured'] / 1000.0))
+
+        client.on('tick', on_tick)
+        t0 = time.perf_counter()
+        await client.connect(url, transports=['websocket'])
+        connect.append(time.perf_counter() - t0)
+        clients.append(client)
+        received.append(ticks)
+    connected.put(count)
+
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, stop.wait)
+    # Ticks already in flight at stop still count as delivered
+    await asyncio.sleep(grace)
+    for client in clients:
+        await client.disconnect()
+    return connect, received
+
+
+def client_process(url, count, connected, stop, grace, results):
+    results.put(asyncio.run(run_clients(url, count, connected, stop, grace)))
+
+
+def load_step(port, clients, seconds=10.0, processes=4, settle=2.0, grace=1.0):
+    """Connect `clients` clients, then measure ticks and engine FPS for `seconds`"""
+    connected, results = multiprocessing.Queue(), multiprocessing.Queue()
+    stop = multiprocessing.Event()
+    shares = [len(share) for share in np.array_split(np.arange(clients), min(processes, clients))] if clients else []
+    workers = [multiprocessing.Process(target=client_process, daemon=True,
+                                       args=(f"http://127.0.0.1:{port}", share, connected, stop, grace, results))
+               for share in shares]
+    for worker in workers:
+        worker.start()
+    for _ in workers:
+        connected.get(timeout=120)
+    time.sleep(settle)
+
+    before = scrape(port)
+    window_start = time.time()
+    fps = []
+    while time.time() - window_start < seconds:
+        time.sleep(0.5)
+        fps.append(metric(scrape(port), 'vision_stage_fps', station='default', stage='trigger'))
+    stop.set()
+    after = scrape(port)
+
+    connect, per_client = [], []
+    for _ in workers:
+        worker_connect, worker_received = results.get(timeout=60)
+        connect.extend(worker_connect)
+        per_client.extend(worker_received)
+    for worker in workers:
+        worker.join(timeout=10)
+
+    # Expected: every tick the engine emitted between the scrapes (n is emitted before it is counted)
+    first = int(metric(before, 'vision_events_total', station='default', event='tick')) + 1
+    last = int(metric(after, 'vision_events_total', station='default', event='tick'))
+    engine_ticks = max(last - first + 1, 0)
+    losses = [1.0 - len({n for n, _, _ in ticks if first <= n <= last}) / engine_ticks
+              for ticks in per_client] if engine_ticks else []
+    latency = [at - captured for ticks in per_client for n, at, captured in ticks if first <= n <= last]
+    return {
+        'clients': clients,
+        'connect_ms': summarize(connect),
+        'latency_ms': summarize(latency),
+        'loss': round(float(np.mean(losses)), 5) if losses else 0.0,
+        'worst_client_loss': round(float(np.max(losses)), 5) if losses else 0.0,
+        'engine_ticks': int(engine_ticks),
+        'fps': round(float(np.mean(fps)), 2) if fps else 0.0,
+    }
+
+
+def run(source, client_counts, port=5098, seconds=10.0, processes=4, async_mode=False):
+    command = [sys.executable, str(ROOT / 'vision_engine.py'), '--source', str(source),
+               '--loop', '--headless', '--tick', '--port', str(port)] + scratch_files()
+    if async_mode:
+        command.append('--async')
+    proc = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    steps = []
+    try:
+        if not wait_ready(port):
+            raise RuntimeError("engine did not become ready")
+        for clients in client_counts:
+            print(f"⏱️  {clients} client(s)...", file=sys.stderr)
+            steps.append(load_step(port, clients, seconds, processes))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    baseline = steps[0]['fps'] if steps and steps[0]['fps'] else None
+    for step in steps:
+        step['fps_ratio'] = round(step['fps'] / baseline, 3) if baseline else None
+    return {
+        'server': 'asyncio' if async_mode else 'eventlet',
+        'source': str(source),
+        'seconds': seconds,
+        'host': {'cpus': os.cpu_count(), 'python': platform.python_version()},
+        'steps': steps,
+    }
+
+
+def check(report, max_p95_ms=None, max_loss=None, min_fps_ratio=None):
+    """Gate violations as readable strings (empty = pass)"""
+    failures = []
+    for step in report['steps']:
+        if not step['clients']:
+            continue
+        p95 = step['latency_ms'].get('p95')
+        if max_p95_ms is not None and (p95 is None or p95 > max_p95_ms):
+            failures.append(f"{step['clients']} clients: p95 latency {p95} ms > {max_p95_ms} ms")
+        if max_loss is not None and step['loss'] > max_loss:
+            failures.append(f"{step['clients']} clients: loss {step['loss']} > {max_loss}")
+        if min_fps_ratio is not None and step['fps_ratio'] is not None and step['fps_ratio'] < min_fps_ratio:
+            failures.append(f"{step['clients']} clients: FPS ratio {step['fps_ratio']} < {min_fps_ratio}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Socket.IO fan-out load test")
+    parser.add_argument('--source', default='synthetic:1280x720@30',
+                        help="engine frame source; replayed files loop (default: synthetic 30 FPS)")
+    parser.add_argument('--clients', default='0,50,100,200',
+                        help="comma-separated client counts, one step each (start with 0 for the FPS baseline)")
+    parser.add_argument('--seconds', type=float, default=10.0, help="measurement window per step")
+    parser.add_argument('--processes', type=int, default=4, help="client processes per step")
+    parser.add_argument('--port', type=int, default=5098)
+    parser.add_argument('--async', dest='async_mode', action='store_true',
+                        help="test the engine's asyncio server instead of eventlet")
+    parser.add_argument('--max-p95-ms', type=float, help="fail if any step's p95 latency exceeds this")
+    parser.add_argument('--max-loss', type=float, help="fail if any step's mean loss exceeds this")
+    parser.add_argument('--min-fps-ratio', type=float,
+                        help="fail if any step's FPS drops below this share of the 0-client step")
+    parser.add_argument('--output', help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    counts = [int(n) for n in args.clients.split(',')]
+    report = run(args.source, counts, args.port, args.seconds, args.processes, args.async_mode)
+    failures = check(report, args.max_p95_ms, args.max_loss, args.min_fps_ratio)
+    report['failures'] = failures
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    for failure in failures:
+        print(f"❌ {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
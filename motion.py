@@ -0,0 +1,101 @@
+"""
+Motion gate for hand inference
+
+Frames are downscaled to grayscale and differenced against the previous
+one, using preallocated buffers. Changed pixels inside the region of
+interest wake full hand inference. Once nothing has moved (and no hand
+has been seen) for `idle_after` seconds, inference drops to one poll
+every `poll_interval` seconds. A still hand hovering over a button is
+kept awake by the engine through keep_awake().
+"""
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    def __init__(self, scale=0.25, threshold=25, min_fraction=0.002,
+                 idle_after=2.0, poll_interval=0.5):
+        self.scale = scale
+        self.threshold = threshold          # gray-level change that counts as motion
+        self.min_fraction = min_fraction    # changed share of the region that wakes inference
+        self.idle_after = idle_after
+        self.poll_interval = poll_interval
+
+        self.last_active = float('-inf')    # last motion or hand
+        self.last_poll = float('-inf')
+        self.frames = 0
+        self.skipped = 0
+        self.wakes = 0
+        self.wake_latency = []              # s from motion frame capture to inference done
+        self._wake_pending = None
+        self._gray = None
+        self._prev = None
+        self._diff = None
+        self._small = None
+
+    def _buffers(self, w, h):
+        size = (max(int(h * self.scale), 1), max(int(w * self.scale), 1))
+        if self._gray is None or self._gray.shape != size:
+            self._small = np.empty(size + (3,), dtype=np.uint8)
+            self._gray = np.empty(size, dtype=np.uint8)
+            self._prev = None
+            self._diff = np.empty(size, dtype=np.uint8)
+        return size
+
+    def motion(self, frame, region=None):
+        """True if enough pixels changed since the last frame inside region (x0, y0, x1, y1)"""
+        h, w = frame.shape[:2]
+        sh, sw = self._buffers(w, h)
+        cv2.resize(frame, (sw, sh), dst=self._small, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        prev = self._prev
+        # Swap instead of copying: the current frame becomes next frame's reference
+        self._prev, self._gray = gray, (prev if prev is not None else np.empty_like(gray))
+        if prev is None:
+            return True
+        diff = cv2.absdiff(gray, prev, dst=self._diff)
+        cv2.threshold(diff, self.threshold, 255, cv2.THRESH_BINARY, dst=diff)
+        if region is not None:
+            x0, y0, x1, y1 = (int(v * self.scale) for v in region)
+            diff = diff[y0:max(y1, y0 + 1), x0:max(x1, x0 + 1)]
+        return cv2.countNonZero(diff) >= self.min_fraction * diff.size
+
+    def should_infer(self, frame, timestamp, region=None):
+        self.frames += 1
+        idle = timestamp - self.last_active > self.idle_after
+        if self.motion(frame, region):
+            if idle:
+                self.wakes += 1
+                self._wake_pending = timestamp
+            self.last_active = timestamp
+            return True
+        if not idle:
+            return True
+        if timestamp - self.last_poll >= self.poll_interval:
+            self.last_poll = timestamp
+            return True
+        self.skipped += 1
+        return False
+
+    def keep_awake(self, timestamp):
+        """A hand is in view: stay at full rate even if it holds still"""
+        self.last_active = max(self.last_active, timestamp)
+
+    def inferred(self, now):
+        """Called after an inference; returns the wake-up latency if this completed a wake"""
+        if self._wake_pending is None:
+            return None
+        latency = now - self._wake_pending
+        self._wake_pending = None
+        self.wake_latency = (self.wake_latency + [latency])[-100:]
+        return latency
+
+    def snapshot(self):
+        return {
+            'frames': self.frames,
+            'skipped': self.skipped,
+            'skipped_ratio': round(self.skipped / self.frames, 3) if self.frames else 0.0,
+            'wakes': self.wakes,
+            'wake_latency_ms': round(float(np.mean(self.wake_latency)) * 1000.0, 2) if self.wake_latency else None,
+        }
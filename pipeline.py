@@ -0,0 +1,439 @@
+"""
+Staged frame pipeline for the Vision Engine
+
+capture thread -> inference worker -> trigger/emit stage -> preview renderer
+
+Stages are connected by small "latest-frame-wins" queues: when a consumer
+falls behind, the oldest queued frame is dropped instead of building up lag.
+"""
+
+import os
+import threading
+import time
+import traceback
+from collections import deque
+
+
+class LatestQueue:
+    """Bounded queue that drops the oldest item when full"""
+
+    def __init__(self, name, maxsize=1, on_put=None):
+        self.name = name
+        self.maxsize = maxsize
+        self.on_put = on_put
+        self._items = deque()
+        self._cond = threading.Condition()
+        self.puts = 0
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                dropped = self._items.popleft()
+                self.dropped += 1
+                if isinstance(dropped, FramePacket):
+                    dropped.release()
+            self._items.append(item)
+            self.puts += 1
+            self._cond.notify()
+        if self.on_put is not None:
+            self.on_put()
+
+    def get(self, timeout=None):
+        """Block (OS threads only) until an item arrives or timeout expires"""
+        with self._cond:
+            if not self._items:
+                self._cond.wait(timeout)
+            return self._items.popleft() if self._items else None
+
+    def get_nowait(self):
+        with self._cond:
+            return self._items.popleft() if self._items else None
+
+    def snapshot(self):
+        return {'puts': self.puts, 'dropped': self.dropped, 'depth': len(self._items)}
+
+
+class Doorbell:
+    """
+    Self-pipe wakeup for a cooperative stage: ring() from any OS thread makes
+    the read end readable, so a greenlet parked on it through the hub wakes
+    at once instead of polling its queue.
+    """
+
+    def __init__(self):
+        self._read, self._write = os.pipe()
+        os.set_blocking(self._read, False)
+        os.set_blocking(self._write, False)
+        self._lock = threading.Lock()   # ring() racing close() must not write to a reused fd
+        self.closed = False
+
+    def fileno(self):
+        return self._read
+
+    def ring(self):
+        with self._lock:
+            if self.closed:
+                return
+            try:
+                os.write(self._write, b'\0')
+            except BlockingIOError:
+                pass    # pipe full: already rung
+
+    def drain(self):
+        try:
+            while os.read(self._read, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self):
+        with self._lock:
+            if not self.closed:
+                self.closed = True
+                os.close(self._read)
+                os.close(self._write)
+
+
+class StageStats:
+    """Throughput and busy-time counters for one pipeline stage"""
+
+    def __init__(self, name):
+        self.name = name
+        self.frames = 0
+        self.busy = 0.0
+        self.last_ms = 0.0
+        self.fps = 0.0
+        self._window_start = time.perf_counter()
+        self._window_frames = 0
+
+    def record(self, elapsed):
+        self.frames += 1
+        self.busy += elapsed
+        self.last_ms = elapsed * 1000.0
+        self._window_frames += 1
+        now = time.perf_counter()
+        span = now - self._window_start
+        if span >= 1.0:
+            self.fps = self._window_frames / span
+            self._window_start = now
+            self._window_frames = 0
+
+    def snapshot(self):
+        avg_ms = (self.busy / self.frames * 1000.0) if self.frames else 0.0
+        return {
+            'frames': self.frames,
+            'fps': round(self.fps, 1),
+            'avg_ms': round(avg_ms, 2),
+            'last_ms': round(self.last_ms, 2),
+        }
+
+
+class FramePacket:
+    """One captured frame and everything the stages learn about it"""
+
+    def __init__(self, seq, frame, timestamp=None, on_release=None):
+        self.seq = seq
+        self.frame = frame
+        self.on_release = on_release    # returns the frame buffer to its ring
+        self.ring_slot = None   # (shm name, slot) when the frame lives in a shared FrameRing
+        self.timestamp = time.monotonic() if timestamp is None else timestamp
+        self.results = None
+        self.roi = None
+        self.landmarks = []     # MediaPipe landmark lists, one per hand (for drawing)
+        self.landmark_array = None  # (hands, 21, 3) float32, normalized
+        self.tips = []          # (hands, 2) index fingertips in full-frame pixels
+        self.screen_tips = None # (hands, 2) fingertips in projector pixels when calibrated
+        self.interpolated = False
+        self.button = None      # ((x, y), radius) when a button scan ran on this frame
+        self.buttons = None     # that scan's [((x, y), radius), ...], applied by the trigger stage
+        self.hits = []
+        self.events = []        # Socket.IO events emitted for this frame
+        self.timings = {}
+
+    def release(self):
+        if self.on_release is not None:
+            self.on_release()
+            self.on_release = None
+
+
+class Pipeline:
+    """
+    Runs capture and inference on OS threads and trigger/preview on
+    `spawn` (e.g. eventlet.spawn) so Socket.IO emits and cv2.imshow stay on
+    the server's thread.
+
+    capture() -> FramePacket or None at end of stream
+    infer(packet), handle(packet): fill in / act on the packet
+    render(packet) -> False to stop the pipeline
+
+    Stages on OS threads (spawn=None) block on their queue. Cooperative
+    stages park on a Doorbell through wait_readable(fd, timeout) (e.g.
+    eventlet's trampoline); without it they fall back to polling.
+    """
+
+    STAGES = ('capture', 'infer', 'trigger', 'render')
+
+    def __init__(self, capture, infer, handle, render=None,
+                 spawn=None, sleep=time.sleep, report_interval=5.0,
+                 scheduler=None, name=None, wait_readable=None):
+        self.capture = capture
+        self.infer = infer
+        self.handle = handle
+        self.render = render
+        self.spawn = spawn
+        self.sleep = sleep
+        self.wait_readable = wait_readable
+        self.report_interval = report_interval
+        self.scheduler = scheduler
+        self.name = name
+
+        self.infer_queue = LatestQueue('infer', on_put=scheduler.wake if scheduler else None)
+        cooperative = spawn is not None and wait_readable is not None
+        self.trigger_bell = Doorbell() if cooperative else None
+        self.render_bell = Doorbell() if cooperative and render is not None else None
+        self.trigger_queue = LatestQueue('trigger', on_put=self.trigger_bell.ring if self.trigger_bell else None)
+        self.render_queue = LatestQueue('render', on_put=self.render_bell.ring if self.render_bell else None)
+        self.stats = {name: StageStats(name) for name in self.STAGES}
+        self.reporters = {}     # name -> callable returning extra report data
+
+        self.running = False
+        self.error = None       # (stage, exception) that stopped the pipeline
+        self._threads = []
+
+    def start(self):
+        self.running = True
+        self._start_thread(self._capture_loop, 'capture')
+        if self.scheduler is not None:
+            self.scheduler.add(self)
+        else:
+            self._start_thread(self._infer_loop, 'infer')
+        self._start_cooperative(self._trigger_loop)
+        if self.render is not None:
+            self._start_cooperative(self._render_loop)
+
+    def stop(self):
+        self.running = False
+        if self.scheduler is not None:
+            self.scheduler.remove(self)
+
+    def fail(self, stage, error):
+        """A stage raised: log it and stop, so run() returns instead of idling with a dead stage"""
+        prefix = f"[{self.name}] " if self.name else ""
+        print(f"❌ {prefix}{stage} stage failed: {error!r}")
+        traceback.print_exc()
+        if self.error is None:
+            self.error = (stage, error)
+        self.stop()
+
+    def wait(self):
+        """Sleep (cooperatively) until the pipeline stops"""
+        last_report = time.monotonic()
+        while self.running:
+            self.sleep(0.1)
+            if self.report_interval and time.monotonic() - last_report >= self.report_interval:
+                last_report = time.monotonic()
+                self.print_report()
+        # join() would block the whole hub; poll the OS threads cooperatively instead
+        deadline = time.monotonic() + 1.0
+        while any(t.is_alive() for t in self._threads) and time.monotonic() < deadline:
+            self.sleep(0.01)
+
+    def _start_thread(self, target, name):
+        t = threading.Thread(target=target, name=f"pipeline-{name}", daemon=True)
+        t.start()
+        self._threads.append(t)
+
+    def _start_cooperative(self, target):
+        if self.spawn is not None:
+            self.spawn(target)
+        else:
+            self._start_thread(target, target.__name__.strip('_'))
+
+    def _next(self, queue, bell):
+        """Next packet for a trigger/render stage, or None after ~0.1 s with nothing queued"""
+        if self.spawn is None:
+            return queue.get(timeout=0.1)
+        packet = queue.get_nowait()
+        if packet is None:
+            if bell is None:
+                self.sleep(0.001)
+            else:
+                # A put() between get_nowait() and here leaves the pipe readable: no lost wakeup
+                self.wait_readable(bell.fileno(), 0.1)
+                bell.drain()
+        return packet
+
+    # --- STAGES ---
+    def _capture_loop(self):
+        stats = self.stats['capture']
+        try:
+            while self.running:
+                t0 = time.perf_counter()
+                packet = self.capture()
+                if packet is None:
+                    self.stop()
+                    break
+                stats.record(time.perf_counter() - t0)
+                self.infer_queue.put(packet)
+        except Exception as e:
+            self.fail('capture', e)
+
+    def _infer_loop(self):
+        try:
+            while self.running:
+                packet = self.infer_queue.get(timeout=0.1)
+                if packet is not None:
+                    self.run_infer(packet)
+        except Exception as e:
+            self.fail('infer', e)
+
+    def run_infer(self, packet):
+        t0 = time.perf_counter()
+        self.infer(packet)
+        self.stats['infer'].record(time.perf_counter() - t0)
+        self.trigger_queue.put(packet)
+
+    def _trigger_loop(self):
+        stats = self.stats['trigger']
+        try:
+            while self.running:
+                packet = self._next(self.trigger_queue, self.trigger_bell)
+                if packet is None:
+                    continue
+                t0 = time.perf_counter()
+                self.handle(packet)
+                stats.record(time.perf_counter() - t0)
+                if self.render is not None:
+                    self.render_queue.put(packet)
+                else:
+                    packet.release()
+        except Exception as e:
+            self.fail('trigger', e)
+        finally:
+            if self.trigger_bell is not None:
+                self.trigger_bell.close()
+
+    def _render_loop(self):
+        stats = self.stats['render']
+        try:
+            while self.running:
+                packet = self._next(self.render_queue, self.render_bell)
+                if packet is None:
+                    continue
+                t0 = time.perf_counter()
+                keep_going = self.render(packet)
+                stats.record(time.perf_counter() - t0)
+                packet.release()
+                if keep_going is False:
+                    self.stop()
+        except Exception as e:
+            self.fail('render', e)
+        finally:
+            if self.render_bell is not None:
+                self.render_bell.close()
+
+    # --- REPORTING ---
+    def report(self):
+        report = {
+            'stages': {name: s.snapshot() for name, s in self.stats.items()},
+            'queues': {q.name: q.snapshot() for q in
+                       (self.infer_queue, self.trigger_queue, self.render_queue)},
+        }
+        for name, reporter in self.reporters.items():
+            report[name] = reporter()
+        return report
+
+    def print_report(self):
+        parts = []
+        for name, s in self.stats.items():
+            if s.frames:
+                parts.append(f"{name} {s.fps:.1f}fps/{s.last_ms:.1f}ms")
+        drops = ", ".join(f"{q.name}:{q.dropped}" for q in
+                          (self.infer_queue, self.trigger_queue, self.render_queue))
+        prefix = f"[{self.name}] " if self.name else ""
+        print(f"📊 {prefix}{' | '.join(parts)} | drops {drops}")
+
+
+class InferenceScheduler:
+    """
+    Shared pool of inference workers for several pipelines (stations).
+
+    Each pipeline keeps its own MediaPipe graph and is processed by at most
+    one worker at a time; workers take stations round-robin so one busy
+    camera cannot starve the others.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self._pipelines = []
+        self._busy = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._next = 0
+        self._threads = []
+        self.running = False
+
+    def add(self, pipeline):
+        with self._lock:
+            self._pipelines.append(pipeline)
+        if not self.running:
+            self.start()
+
+    def remove(self, pipeline):
+        with self._lock:
+            if pipeline in self._pipelines:
+                self._pipelines.remove(pipeline)
+
+    def wake(self):
+        self._wake.set()
+
+    def start(self):
+        self.running = True
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, name=f"infer-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self):
+        self.running = False
+        self._wake.set()
+
+    def _claim(self):
+        """Next idle pipeline with a queued frame, round-robin"""
+        with self._lock:
+            count = len(self._pipelines)
+            for i in range(count):
+                pipeline = self._pipelines[(self._next + i) % count]
+                if pipeline in self._busy:
+                    continue
+                packet = pipeline.infer_queue.get_nowait()
+                if packet is not None:
+                    self._next = (self._next + i + 1) % count
+                    self._busy.add(pipeline)
+                    return pipeline, packet
+        return None, None
+
+    def _worker(self):
+        while self.running:
+            # Clear before looking so a put() that races with us is not lost
+            self._wake.clear()
+            pipeline, packet = self._claim()
+            if pipeline is None:
+                self._wake.wait(0.01)
+                continue
+            try:
+                pipeline.run_infer(packet)
+            except Exception as e:
+                # Only this station stops; the pool keeps serving the others
+                pipeline.fail('infer', e)
+            finally:
+                with self._lock:
+                    self._busy.discard(pipeline)
+                # Another frame may have queued while this station was busy
+                self._wake.set()
+
+    def snapshot(self):
+        with self._lock:
+            return {'workers': self.workers, 'stations': len(self._pipelines),
+                    'busy': len(self._busy)}
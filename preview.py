@@ -0,0 +1,121 @@
+"""
+MJPEG preview stream
+
+The render stage hands its annotated frame to submit(); when somebody is
+watching and the FPS cap allows, the frame is copied into a back buffer
+and a dedicated encoder thread turns it into a JPEG. Every viewer is sent
+that same JPEG, so a frame is encoded at most once no matter how many
+viewers there are. With no viewers submit() returns at once and nothing
+is copied or encoded. Encoding never runs on the inference or trigger
+path.
+"""
+
+import asyncio
+import threading
+import time
+
+import cv2
+import numpy as np
+
+BOUNDARY = 'frame'
+
+
+class PreviewStream:
+    def __init__(self, quality=70, fps=10.0):
+        self.quality = quality
+        self.fps = fps
+        self.viewers = 0
+        self.frame_id = 0           # bumps on every finished JPEG
+        self.jpeg = None
+        self.encoded = 0
+        self.encode_seconds = 0.0
+        self.running = True
+
+        self._front = None          # being encoded
+        self._back = None           # latest submitted frame
+        self._pending = False
+        self._last_submit = 0.0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._encode_loop, name='preview-encoder', daemon=True)
+        self._thread.start()
+
+    def wants_frame(self):
+        """True when a viewer is connected and the FPS cap allows another frame"""
+        return self.viewers > 0 and time.monotonic() - self._last_submit >= 1.0 / self.fps
+
+    def submit(self, frame):
+        if not self.wants_frame():
+            return False
+        with self._lock:
+            if self._back is None or self._back.shape != frame.shape:
+                self._back = np.empty_like(frame)
+            np.copyto(self._back, frame)
+            self._pending = True
+        self._last_submit = time.monotonic()
+        self._wake.set()
+        return True
+
+    def _encode_loop(self):
+        params = [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+        while self.running:
+            if not self._wake.wait(0.5):
+                continue
+            self._wake.clear()
+            with self._lock:
+                if not self._pending:
+                    continue
+                self._front, self._back = self._back, self._front
+                self._pending = False
+            t0 = time.perf_counter()
+            ok, jpeg = cv2.imencode('.jpg', self._front, params)
+            if not ok:
+                continue
+            self.encode_seconds += time.perf_counter() - t0
+            self.encoded += 1
+            self.jpeg = jpeg.tobytes()
+            self.frame_id += 1
+
+    @staticmethod
+    def part(jpeg):
+        return (f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                f"Content-Length: {len(jpeg)}\r\n\r\n").encode() + jpeg + b"\r\n"
+
+    def frames(self, sleep=time.sleep):
+        """multipart/x-mixed-replace body for one viewer"""
+        self.viewers += 1
+        try:
+            last = self.frame_id
+            while self.running:
+                if self.frame_id == last:
+                    sleep(0.005)
+                    continue
+                last, jpeg = self.frame_id, self.jpeg
+                yield self.part(jpeg)
+        finally:
+            self.viewers -= 1
+
+    async def aframes(self):
+        """frames() for asyncio servers"""
+        self.viewers += 1
+        try:
+            last = self.frame_id
+            while self.running:
+                if self.frame_id == last:
+                    await asyncio.sleep(0.005)
+                    continue
+                last, jpeg = self.frame_id, self.jpeg
+                yield self.part(jpeg)
+        finally:
+            self.viewers -= 1
+
+    def close(self):
+        self.running = False
+        self._wake.set()
+
+    def snapshot(self):
+        return {
+            'viewers': self.viewers,
+            'encoded': self.encoded,
+            'encode_ms': round(self.encode_seconds / self.encoded * 1000.0, 2) if self.encoded else 0.0,
+        }
@@ -0,0 +1,101 @@
+"""
+Temporal smoothing and fingertip prediction
+
+A One-Euro filter (Casiez et al., CHI 2012) per tracked hand removes
+landmark jitter while staying responsive to fast moves, and its velocity
+estimate is used to extrapolate the fingertip from the frame's capture time
+to "now", hiding a frame or two of pipeline latency.
+"""
+
+import math
+
+import numpy as np
+
+import gestures
+
+
+def _alpha(cutoff, dt):
+    tau = 1.0 / (2.0 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilter:
+    """One-Euro filter over an array of any shape (all elements filtered independently)"""
+
+    def __init__(self, min_cutoff=1.0, beta=0.02, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.value = None
+        self.velocity = None
+        self.timestamp = None
+
+    def __call__(self, x, timestamp):
+        x = np.asarray(x, dtype=np.float32)
+        if self.value is None or timestamp <= self.timestamp:
+            self.value = x.copy()
+            self.velocity = np.zeros_like(x)
+            self.timestamp = timestamp
+            return self.value
+        dt = timestamp - self.timestamp
+        self.timestamp = timestamp
+
+        a_d = _alpha(self.d_cutoff, dt)
+        self.velocity = a_d * (x - self.value) / dt + (1.0 - a_d) * self.velocity
+        cutoff = self.min_cutoff + self.beta * np.abs(self.velocity)
+        tau = 1.0 / (2.0 * np.pi * cutoff)
+        a = 1.0 / (1.0 + tau / dt)
+        self.value = a * x + (1.0 - a) * self.value
+        return self.value
+
+
+class HandSmoother:
+    """
+    Per-hand One-Euro filtering of (hands, 21, 3) landmarks in pixel space.
+    Hands are matched to existing tracks by nearest wrist; tracks unseen for
+    `max_age` seconds are dropped.
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=0.02, max_age=0.3, max_lookahead=0.1):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.max_age = max_age
+        self.max_lookahead = max_lookahead
+        self.tracks = []    # [filter, last_seen]
+        self.current = []   # track for each hand of the latest update
+
+    def update(self, landmarks, w, h, timestamp):
+        """Smoothed (hands, 21, 3) landmarks, in pixels for x/y"""
+        self.tracks = [t for t in self.tracks if timestamp - t[1] <= self.max_age]
+        scale = np.array([w, h, w], dtype=np.float32)
+        smoothed = np.empty_like(landmarks, dtype=np.float32)
+        free = list(self.tracks)
+        self.current = []
+        for i, hand in enumerate(np.asarray(landmarks, dtype=np.float32) * scale):
+            track = self._nearest(free, hand[gestures.WRIST, :2])
+            if track is None:
+                track = [OneEuroFilter(self.min_cutoff, self.beta), timestamp]
+                self.tracks.append(track)
+            else:
+                free.remove(track)
+            smoothed[i] = track[0](hand, timestamp)
+            track[1] = timestamp
+            self.current.append(track)
+        return smoothed
+
+    @staticmethod
+    def _nearest(tracks, wrist, max_dist=150.0):
+        best, best_d = None, max_dist
+        for track in tracks:
+            d = float(np.hypot(*(track[0].value[gestures.WRIST, :2] - wrist)))
+            if d < best_d:
+                best, best_d = track, d
+        return best
+
+    def predict_tips(self, smoothed, now, timestamp):
+        """Index fingertips of the latest update, extrapolated from capture time to `now`"""
+        lookahead = min(max(now - timestamp, 0.0), self.max_lookahead)
+        tips = smoothed[:, gestures.INDEX_TIP, :2].copy()
+        for tip, track in zip(tips, self.current):
+            tip += track[0].velocity[gestures.INDEX_TIP, :2] * lookahead
+        return tips
@@ -3,20 +3,37 @@
 # Kill existing processes on specific ports
 lsof -ti :8000,5001 | xargs kill -9 2>/dev/null || true
 pkill -f vision_engine.py
-pkill -f "python3 -m http.server"
+pkill -f static_server.py
 
 # Start Vision Engine in background
 echo "🚀 Starting Vision Engine..."
 python3 vision_engine.py &
+ENGINE_PID=$!
 
-# Start Web Server for Frontend
+# Start Web Server for Frontend (threaded; ETags, gzip/brotli variants, video ranges)
 echo "🌐 Starting Frontend Server..."
-python3 -m http.server 8000 &
+python3 static_server.py --precompress --port 8000 &
+
+# The engine listens at once and reports /ready when capture and MediaPipe are warm
+READY_TIMEOUT=${READY_TIMEOUT:-60}
+deadline=$((SECONDS + READY_TIMEOUT))
+until curl -sf http://localhost:5001/ready > /dev/null; do
+    if ! kill -0 "$ENGINE_PID" 2>/dev/null; then
+        echo "❌ Vision Engine exited during startup"
+        exit 1
+    fi
+    if [ "$SECONDS" -ge "$deadline" ]; then
+        echo "❌ Vision Engine not ready after ${READY_TIMEOUT}s (camera connected? see its log above)"
+        curl -s http://localhost:5001/ready; echo
+        exit 1
+    fi
+    sleep 0.2
+done
 
 echo "✨ System ready!"
 echo "1. Open http://localhost:8000 in your projector's browser (Chrome recommended)"
 echo "2. Focus the Python window and press 'C' to calibrate"
-echo "3. Follow the on-screen dots and press SPACE on each"
+echo "3. Follow the on-screen dots and press SPACE on each (saved to screen_calibration.npz)"
 echo "4. Enjoy the vibe!"
 
 # Keep script alive
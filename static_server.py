@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Frontend static-asset server
+
+Threaded replacement for `python3 -m http.server` / backup/server.py:
+
+- one thread per connection, HTTP/1.1 keep-alive
+- ETag + Last-Modified validation (304 Not Modified)
+- Cache-Control: content-hashed names (app.3f9c2a1b.js) are cached for a
+  year as immutable; everything else is revalidated on each load
+- precompressed .br / .gz variants sent when the browser accepts them
+  (build them with --precompress)
+- single byte ranges (206 Partial Content) so the video can seek
+
+    python3 static_server.py                 # serve this directory on :8000
+    python3 static_server.py --precompress   # write .gz/.br next to text assets, then serve
+"""
+
+import argparse
+import email.utils
+import gzip
+import http.server
+import mimetypes
+import os
+import re
+import sys
+import urllib.parse
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:     # optional: only .gz variants are built without it
+    brotli = None
+
+# Configuration
+PORT = 8000
+DIRECTORY = Path(__file__).parent
+
+INDEX = 'index.html'
+COMPRESSIBLE = {'.html', '.js', '.mjs', '.css', '.json', '.svg', '.txt'}
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))     # preference order
+HASHED_NAME = re.compile(r'\.[0-9a-f]{8,}\.\w+$')   # name.<content hash>.ext
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def etag(stat, suffix=''):
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}{suffix}"'
+
+
+def parse_range(header, size):
+    """'bytes=a-b' -> (start, end) inclusive; None to ignore the header; ValueError if unsatisfiable"""
+    match = RANGE.match(header.strip())
+    if not match:
+        return None     # malformed or multi-range: send the whole file
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the final `last` bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+class StaticHandler(http.server.BaseHTTPRequestHandler):
+    """GET/HEAD for files under `root`, with validation, precompression and ranges"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'VibeStatic/1.0'
+    root = DIRECTORY
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_HEAD(self):
+        self.serve(body=False)
+
+    def do_GET(self):
+        self.serve(body=True)
+
+    def end_headers(self):
+        # CORS headers for the projector page's cross-origin requests
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, HEAD, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Range')
+        super().end_headers()
+
+    def resolve(self):
+        """Request path -> file under root, or None"""
+        path = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path)
+        relative = Path(os.path.normpath(path.lstrip('/') or INDEX))
+        if relative.parts and relative.parts[0] == '..':
+            return None
+        target = self.root / relative
+        if target.is_dir():
+            target = target / INDEX
+        return target if target.is_file() else None
+
+    def negotiate(self, path):
+        """Best precompressed variant the client accepts: (path, encoding or None)"""
+        if path.suffix not in COMPRESSIBLE or 'Range' in self.headers:
+            return path, None
+        accepted = {token.split(';')[0].strip() for token in self.headers.get('Accept-Encoding', '').split(',')}
+        for encoding, suffix in ENCODINGS:
+            variant = path.with_name(path.name + suffix)
+            # Ignore variants left over from an older version of the file
+            if encoding in accepted and variant.is_file() and variant.stat().st_mtime >= path.stat().st_mtime:
+                return variant, encoding
+        return path, None
+
+    def not_modified(self, tag, mtime):
+        if 'If-None-Match' in self.headers:
+            return tag in (t.strip() for t in self.headers['If-None-Match'].split(',')) \
+                or self.headers['If-None-Match'].strip() == '*'
+        since = self.headers.get('If-Modified-Since')
+        if since:
+            try:
+                return int(mtime) <= email.utils.parsedate_to_datetime(since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def serve(self, body):
+        path = self.resolve()
+        if path is None:
+            self.send_error(404, "File not found")
+            return
+        source, encoding = self.negotiate(path)
+        stat = source.stat()
+        tag = etag(stat, f"-{encoding}" if encoding else '')
+        content_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+        if path.suffix in ('.js', '.mjs'):
+            content_type = 'application/javascript'
+
+        def common_headers():
+            self.send_header('ETag', tag)
+            self.send_header('Last-Modified', email.utils.formatdate(stat.st_mtime, usegmt=True))
+            self.send_header('Cache-Control', IMMUTABLE if HASHED_NAME.search(path.name) else REVALIDATE)
+            self.send_header('Accept-Ranges', 'bytes')
+            if path.suffix in COMPRESSIBLE:
+                self.send_header('Vary', 'Accept-Encoding')
+
+        if self.not_modified(tag, stat.st_mtime):
+            self.send_response(304)
+            common_headers()
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        start, end, status = 0, stat.st_size - 1, 200
+        range_header = self.headers.get('Range')
+        # If-Range: only honour the range if the client's copy is still current
+        if range_header and self.headers.get('If-Range', tag) == tag:
+            try:
+                requested = parse_range(range_header, stat.st_size)
+            except ValueError:
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{stat.st_size}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            if requested is not None:
+                (start, end), status = requested, 206
+
+        length = max(end - start + 1, 0)
+        self.send_response(status)
+        common_headers()
+        self.send_header('Content-Type', content_type)
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        if status == 206:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{stat.st_size}')
+        self.send_header('Content-Length', str(length))
+        self.end_headers()
+        if not body or not length:
+            return
+        with open(source, 'rb') as f:
+            try:
+                # sendfile(2) where available: no copy through Python for the video
+                self.connection.sendfile(f, start, length)
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True    # seek or reload cancelled the request
+
+    def log_message(self, format, *args):
+        pass    # one line per video range request is mostly noise
+
+
+def precompress(root=DIRECTORY):
+    """Write .gz (and .br when the brotli module is installed) for text assets that changed"""
+    written = []
+    for path in Path(root).iterdir():
+        if path.suffix not in COMPRESSIBLE or not path.is_file():
+            continue
+        data = None
+        for encoding, suffix in ENCODINGS:
+            if encoding == 'br' and brotli is None:
+                continue
+            variant = path.with_name(path.name + suffix)
+            if variant.is_file() and variant.stat().st_mtime >= path.stat().st_mtime:
+                continue
+            data = data if data is not None else path.read_bytes()
+            compressed = brotli.compress(data) if encoding == 'br' else gzip.compress(data, 9, mtime=0)
+            variant.write_bytes(compressed)
+            written.append(f"{variant.name} ({len(data)} -> {len(compressed)} B)")
+    return written
+
+
+def run_server(port=PORT, root=DIRECTORY):
+    """Start the threaded HTTP server"""
+    StaticHandler.root = Path(root)
+    try:
+        with http.server.ThreadingHTTPServer(("", port), StaticHandler) as httpd:
+            print(f"🌐 Frontend at http://localhost:{port} (serving {root})")
+            httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Frontend server stopped")
+    except OSError as e:
+        print(f"❌ Frontend server: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Frontend static-asset server")
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--root', default=str(DIRECTORY), help="directory to serve")
+    parser.add_argument('--precompress', action='store_true',
+                        help="write .gz/.br variants of changed text assets before serving")
+    args = parser.parse_args()
+    if args.precompress:
+        for line in precompress(args.root) or ["all variants up to date"]:
+            print(f"🗜️  {line}")
+    run_server(args.port, args.root)
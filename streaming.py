@@ -0,0 +1,127 @@
+"""
+Binary state stream for the frontend
+
+Every frame the engine can push a compact binary 'state' message to
+subscribed Socket.IO clients:
+
+    header  '<BBBBId'  version, flags, hands, targets, seq, capture time (epoch ms)
+    hands   float32 x, y per hand   (projector px if FLAG_SCREEN, else normalized camera)
+    targets '<HBB'     id, state bits (STATE_INSIDE | STATE_FIRED), reserved
+
+Delivery is acknowledged per client. At most `window` messages are in
+flight per client; anything newer waits in a single pending slot that is
+overwritten by later frames, so a slow browser always gets the latest
+state instead of a growing backlog.
+"""
+
+import struct
+import threading
+import time
+
+import numpy as np
+
+VERSION = 1
+HEADER = struct.Struct('<BBBBId')
+TARGET = struct.Struct('<HBB')
+
+FLAG_SCREEN = 1     # positions are calibrated projector pixels
+
+STATE_INSIDE = 1    # a fingertip is inside the trigger zone
+STATE_FIRED = 2     # the target fired on this frame
+
+
+def epoch_ms(timestamp):
+    """Monotonic capture time as wall-clock epoch ms, comparable to Date.now()"""
+    return (time.time() - (time.monotonic() - timestamp)) * 1000.0
+
+
+def pack_state(seq, timestamp, positions, targets, screen=False):
+    """
+    positions: (hands, 2); targets: [(id, state), ...]; timestamp: monotonic
+    capture time, sent as epoch ms so the browser can compare it to Date.now().
+    """
+    positions = np.asarray(positions, dtype='<f4').reshape(-1, 2)
+    parts = [HEADER.pack(VERSION, FLAG_SCREEN if screen else 0, len(positions), len(targets),
+                         seq & 0xFFFFFFFF, epoch_ms(timestamp)),
+             positions.tobytes()]
+    parts.extend(TARGET.pack(target_id, state, 0) for target_id, state in targets)
+    return b''.join(parts)
+
+
+class ClientStream:
+    def __init__(self):
+        self.in_flight = 0
+        self.pending = None
+        self.sent = 0
+        self.coalesced = 0
+
+
+class StateStream:
+    """
+    Per-client coalescing sender. publish() may run on a different thread
+    from the acks (asyncio server mode), so bookkeeping happens under a lock
+    and the actual emits after it is released.
+    """
+
+    def __init__(self, sio, namespace='/', event='state', window=2):
+        self.sio = sio
+        self.namespace = namespace
+        self.event = event
+        self.window = window
+        self.clients = {}       # sid -> ClientStream
+        self.sent = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+
+    def subscribe(self, sid):
+        with self._lock:
+            self.clients.setdefault(sid, ClientStream())
+
+    def unsubscribe(self, sid):
+        with self._lock:
+            self.clients.pop(sid, None)
+
+    def publish(self, payload):
+        sends = []
+        with self._lock:
+            for sid, client in self.clients.items():
+                if client.in_flight < self.window:
+                    self._claim(client)
+                    sends.append(sid)
+                else:
+                    if client.pending is not None:
+                        client.coalesced += 1
+                        self.coalesced += 1
+                    client.pending = payload
+        for sid in sends:
+            self._send(sid, payload)
+
+    def _claim(self, client):
+        client.in_flight += 1
+        client.sent += 1
+        self.sent += 1
+
+    def _send(self, sid, payload):
+        self.sio.emit(self.event, payload, to=sid, namespace=self.namespace,
+                      callback=lambda *args: self._ack(sid))
+
+    def _ack(self, sid):
+        with self._lock:
+            client = self.clients.get(sid)
+            if client is None:
+                return
+            client.in_flight = max(client.in_flight - 1, 0)
+            if client.pending is None or client.in_flight >= self.window:
+                return
+            payload, client.pending = client.pending, None
+            self._claim(client)
+        self._send(sid, payload)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'clients': len(self.clients),
+                'sent': self.sent,
+                'coalesced': self.coalesced,
+                'in_flight': sum(c.in_flight for c in self.clients.values()),
+            }
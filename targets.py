@@ -0,0 +1,212 @@
+"""
+Multi-target button map
+
+Holds every projected button the engine knows about (id, center, radius,
+manual/auto) with its own trigger/debounce state, and answers "which
+targets is this fingertip near?" through a uniform grid index: each target
+is bucketed by its center into cells at least as wide as the largest
+trigger zone, so a lookup only inspects the 3x3 cells around the fingertip
+regardless of how many targets exist.
+
+Edits are copy-on-write under a lock: the target dict and grid index are
+swapped in whole, never changed in place, so another thread can iterate
+the map or take bounds() while the trigger stage or a socket handler
+edits it.
+"""
+
+import math
+import os
+import threading
+
+import numpy as np
+
+from triggers import ProximityTrigger
+
+
+class Target:
+    """One button and its per-target trigger state"""
+
+    def __init__(self, target_id, center, radius=None, manual=False,
+                 hit_radius=90.0, release_radius=None, debounce=2.0):
+        self.id = target_id
+        self.center = (int(center[0]), int(center[1]))
+        self.radius = int(radius) if radius else None
+        self.manual = manual
+        self.misses = 0
+        self.trigger = ProximityTrigger(radius=hit_radius, debounce=debounce,
+                                        release_radius=release_radius)
+
+    def to_row(self):
+        return [self.id, self.center[0], self.center[1], self.radius or 0, int(self.manual)]
+
+
+class TargetMap:
+    """Targets with a grid spatial index for O(1) fingertip hit tests"""
+
+    def __init__(self, hit_radius=90.0, release_radius=None, debounce=2.0,
+                 match_distance=60.0, max_misses=3):
+        self.hit_radius = hit_radius
+        self.release_radius = hit_radius if release_radius is None else release_radius
+        self.debounce = debounce
+        self.match_distance = match_distance  # px a detection may move and keep its id
+        self.max_misses = max_misses          # scans an auto target may be missing
+        self.targets = {}
+        self._next_id = 0
+        self._index = (1.0, {})     # (cell size, {cell: [targets]}), swapped in whole
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.targets)
+
+    def __iter__(self):
+        return iter(self.targets.values())
+
+    @property
+    def primary(self):
+        """Lowest-id target (the single target of the classic setup)"""
+        targets = self.targets
+        return targets[min(targets)] if targets else None
+
+    # --- EDITING ---
+    def add(self, center, radius=None, manual=False, target_id=None):
+        with self._lock:
+            if target_id is None:
+                target_id = self._next_id
+            self._next_id = max(self._next_id, target_id + 1)
+            target = Target(target_id, center, radius, manual,
+                            self.hit_radius, self.release_radius, self.debounce)
+            self.targets = {**self.targets, target_id: target}
+            self._reindex()
+            return target
+
+    def move(self, target, center, radius=None):
+        with self._lock:
+            target.center = (int(center[0]), int(center[1]))
+            if radius:
+                target.radius = int(radius)
+            target.misses = 0
+            self._reindex()
+
+    def clear(self):
+        with self._lock:
+            self.targets = {}
+            self._reindex()
+
+    def set_zone(self, hit_radius=None, release_radius=None):
+        with self._lock:
+            if hit_radius is not None:
+                self.hit_radius = hit_radius
+            if release_radius is not None:
+                self.release_radius = release_radius
+            for target in self:
+                target.trigger.radius = self.hit_radius
+                target.trigger.release_radius = self.release_radius
+            self._reindex()
+
+    def update_detections(self, detections):
+        """
+        Merge one scan's [((x, y), radius), ...] into the map: detections near
+        a known auto target keep its id and trigger state, new ones are added,
+        auto targets missing for max_misses scans are dropped. Manual targets
+        are never touched. Returns the newly added targets.
+        """
+        with self._lock:
+            unmatched = {t.id: t for t in self if not t.manual}
+            added = []
+            for center, radius in detections:
+                best, best_d = None, self.match_distance
+                for target in unmatched.values():
+                    d = math.hypot(center[0] - target.center[0], center[1] - target.center[1])
+                    if d < best_d:
+                        best, best_d = target, d
+                if best is not None:
+                    del unmatched[best.id]
+                    best.center = (int(center[0]), int(center[1]))
+                    best.radius = int(radius)
+                    best.misses = 0
+                elif not any(t.manual and math.hypot(center[0] - t.center[0], center[1] - t.center[1])
+                             < self.match_distance for t in self):
+                    added.append(self.add(center, radius))
+            dropped = set()
+            for target in unmatched.values():
+                target.misses += 1
+                if target.misses >= self.max_misses:
+                    dropped.add(target.id)
+            self.targets = {i: t for i, t in self.targets.items() if i not in dropped}
+            self._reindex()
+            return added
+
+    def bounds(self):
+        """(x0, y0, x1, y1) spanned by the target centers, or None"""
+        targets = list(self)
+        if not targets:
+            return None
+        xs = [t.center[0] for t in targets]
+        ys = [t.center[1] for t in targets]
+        return min(xs), min(ys), max(xs), max(ys)
+
+    # --- SPATIAL INDEX ---
+    def _reindex(self):
+        cell = 2.0 * max(self.hit_radius, self.release_radius)
+        grid = {}
+        for target in self:
+            key = (int(target.center[0] // cell), int(target.center[1] // cell))
+            grid.setdefault(key, []).append(target)
+        self._index = (cell, grid)
+
+    def nearby(self, x, y):
+        """Targets whose trigger zone could contain (x, y)"""
+        cell, grid = self._index
+        cx, cy = int(x // cell), int(y // cell)
+        found = []
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                found.extend(grid.get((gx, gy), ()))
+        return found
+
+    def hit_test(self, tips, now):
+        """
+        tips: (hands, 2) pixels. Returns (nearest, fired):
+        nearest[i] = (target, dist) for hand i or None when no target is near,
+        fired = [(target, hand_index, dist), ...] for targets whose trigger fired.
+        """
+        tips = np.asarray(tips, dtype=np.float32)
+        candidates = {}
+        for i, (x, y) in enumerate(tips.tolist()):
+            for target in self.nearby(x, y):
+                candidates.setdefault(target.id, []).append(i)
+
+        nearest = [None] * len(tips)
+        fired = []
+        for target in self:
+            hands = candidates.get(target.id)
+            if hands is None:
+                if target.trigger.inside:
+                    target.trigger.update((), target.center, now)
+                continue
+            d, hit = target.trigger.update(tips[hands], target.center, now)
+            for i, dist in zip(hands, d.tolist()):
+                if nearest[i] is None or dist < nearest[i][1]:
+                    nearest[i] = (target, dist)
+            if hit is not None:
+                fired.append((target, hands[hit], float(d[hit])))
+        return nearest, fired
+
+    # --- PERSISTENCE ---
+    def save(self, path):
+        """Rows of [id, x, y, radius, manual] in a .npy file"""
+        np.save(path, np.array([t.to_row() for t in self], dtype=np.int32).reshape(-1, 5))
+
+    def load(self, path):
+        """Load a saved map; a legacy (x, y) center_lock.npy becomes one manual target"""
+        if not os.path.exists(path):
+            return False
+        data = np.load(path)
+        with self._lock:
+            self.clear()
+            if data.ndim == 1 and data.size == 2:
+                self.add(tuple(data.tolist()), manual=True)
+            else:
+                for target_id, x, y, radius, manual in data.reshape(-1, 5).tolist():
+                    self.add((x, y), radius or None, bool(manual), target_id)
+        return True
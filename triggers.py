@@ -0,0 +1,63 @@
+"""
+Trigger logic shared by the live engine and offline replay
+
+Triggers take the clock as an argument instead of calling time.time(), so
+recorded sessions can be replayed through exactly the same code at any
+speed.
+"""
+
+import numpy as np
+
+
+class ProximityTrigger:
+    """
+    Fires when any fingertip is within `radius` px of the target, at most once
+    per `debounce` s. With `release_radius` > radius the zone has hysteresis:
+    once entered, a fingertip counts as inside until it leaves release_radius,
+    so jitter around the edge cannot flicker in and out.
+    """
+
+    def __init__(self, radius=90.0, debounce=2.0, release_radius=None):
+        self.radius = radius
+        self.release_radius = radius if release_radius is None else release_radius
+        self.debounce = debounce
+        self.inside = False
+        self.last_fire = float('-inf')
+        self.fired = 0
+
+    def update(self, tips, target, now):
+        """
+        tips: (hands, 2) pixels; target: (x, y) or None.
+        Returns (distances or None, index of the hand that fired or None).
+        """
+        if target is None or len(tips) == 0:
+            self.inside = False
+            return None, None
+        tips = np.asarray(tips, dtype=np.float32)
+        d = np.hypot(*(tips - np.asarray(target, dtype=np.float32)).T)
+        in_range = np.flatnonzero(d < (self.release_radius if self.inside else self.radius))
+        self.inside = bool(in_range.size)
+        if in_range.size and now - self.last_fire > self.debounce:
+            self.last_fire = now
+            self.fired += 1
+            return d, int(in_range[0])
+        return d, None
+
+
+class HoldTrigger:
+    """Fires once a condition has held for `required_frames` consecutive frames (thumbs-up hold)"""
+
+    def __init__(self, required_frames=10):
+        self.required_frames = required_frames
+        self.frames = 0
+        self.fired = 0
+
+    def update(self, active):
+        """Returns True on every frame the hold is satisfied"""
+        if not active:
+            self.frames = 0
+            return False
+        self.frames += 1
+        if self.frames == self.required_frames:
+            self.fired += 1
+        return self.frames >= self.required_frames
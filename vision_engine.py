@@ -1,142 +1,1193 @@
+import time
+PROCESS_STARTED = time.perf_counter()   # startup phases are measured from here
+
 import cv2
-import mediapipe as mp
 import numpy as np
 import socketio
 import eventlet
 import eventlet.wsgi
-from flask import Flask
-import time
-import os
+from flask import Flask, Response, abort, jsonify, request
+import argparse
+import atexit
+import functools
+import threading
+
+from pipeline import Pipeline, FramePacket, InferenceScheduler
+from frame_sources import open_source
+from button_tracker import ButtonTracker
+from inference_backend import ProcessHandsBackend
+from frame_ring import FrameRing
+from metrics import registry, SamplingProfiler
+from gestures import landmarks_to_array, to_pixels
+from targets import TargetMap
+from calibration import Calibration, CalibrationSession, DOT_LOWER, DOT_UPPER
+from streaming import StateStream, epoch_ms, pack_state, STATE_INSIDE, STATE_FIRED
+from preview import PreviewStream, BOUNDARY
+from smoothing import HandSmoother
+from motion import MotionGate
+from landmark_log import LandmarkRecorder
+
+# Process-wide startup phases (seconds since PROCESS_STARTED); engines keep their own
+STARTUP = {'imports': round(time.perf_counter() - PROCESS_STARTED, 4)}
 
 # Initialize Socket.IO server
-sio = socketio.Server(cors_allowed_origins='*')
+sio = socketio.Server(cors_allowed_origins='*', namespaces='*')
 app = Flask(__name__)
 app.wsgi_app = socketio.WSGIApp(sio, app.wsgi_app)
 
-# Mediapipe constants
-mp_hands = mp.solutions.hands
-mp_drawing = mp.solutions.drawing_utils
+# Metrics (served at /metrics)
+FRAMES = registry.counter('vision_frames_total', "Frames that completed the trigger stage")
+INTERPOLATED = registry.counter('vision_interpolated_frames_total', "Frames whose fingertips were extrapolated, not inferred")
+STAGE_LATENCY = registry.histogram('vision_stage_latency_seconds', "Per-frame latency of each pipeline stage")
+STAGE_FPS = registry.gauge('vision_stage_fps', "Throughput of each pipeline stage over the last second")
+DROPPED = registry.counter('vision_dropped_frames_total', "Frames dropped by latest-frame-wins queues")
+EVENTS = registry.counter('vision_events_total', "Socket.IO events emitted by the engine")
+CLIENTS = registry.gauge('vision_connected_clients', "Connected Socket.IO clients")
+TARGET = registry.gauge('vision_target_position_pixels', "Last locked target center")
+TARGET_MANUAL = registry.gauge('vision_target_manual_lock', "1 if the primary target was locked manually, 0 if auto-detected or none")
+TARGETS = registry.gauge('vision_targets', "Buttons in the station's target map")
+GOVERNOR_LEVEL = registry.gauge('vision_governor_level', "Current inference governor level")
+STREAM_SENT = registry.counter('vision_stream_messages_total', "Binary state messages sent to subscribed clients")
+STREAM_COALESCED = registry.counter('vision_stream_coalesced_total', "State messages replaced by newer ones before a slow client acked")
+PREVIEW_VIEWERS = registry.gauge('vision_preview_viewers', "Open MJPEG preview connections")
+PREVIEW_ENCODED = registry.counter('vision_preview_frames_encoded_total', "Preview frames JPEG-encoded (once per frame for all viewers)")
+READY = registry.gauge('vision_ready', "1 once capture and the warmed-up hands graph are ready")
+STARTUP_SECONDS = registry.gauge('vision_startup_seconds', "Duration of each startup phase")
+MOTION_SKIPPED = registry.gauge('vision_motion_skipped_ratio', "Share of frames the motion gate kept from hand inference")
+MOTION_WAKE = registry.histogram('vision_motion_wake_seconds', "Capture of the first moving frame after idle to inference done")
+CLIENT_LATENCY = registry.histogram('vision_client_latency_seconds', "Capture-to-render latency reported by the browser")
+CAPTURE_TO_EMIT = registry.histogram('vision_capture_to_emit_seconds', "Camera grab of a frame to its Socket.IO event being sent")
+CAPTURE_DROPPED = registry.counter('vision_capture_dropped_frames_total', "Frames grabbed by the camera reader but superseded before use")
+
+profiler = SamplingProfiler()
+
+@app.route('/metrics')
+def metrics():
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/debug/profile')
+def debug_profile():
+    """Sample all threads for ?seconds=N (default 5) and return collapsed stacks"""
+    if not app.config.get('PROFILING'):
+        abort(404)
+    seconds = min(float(request.args.get('seconds', 5)), 60.0)
+    if not profiler.start(seconds):
+        return Response("profile already running\n", status=409, mimetype='text/plain')
+    while profiler.running:
+        eventlet.sleep(0.1)
+    return Response(profiler.report(), mimetype='text/plain')
+
+@app.route('/preview')
+@app.route('/preview/<station>')
+def preview(station=None):
+    """Annotated frames as MJPEG (multi-station: /preview/NAME)"""
+    engine = engines.get(f"/{station}" if station else '/')
+    if engine is None or engine.preview is None:
+        abort(404)
+    return Response(engine.preview.frames(eventlet.sleep),
+                    mimetype=f'multipart/x-mixed-replace; boundary={BOUNDARY}')
+
+def readiness():
+    """(/ready body, status): 200 once every station can process frames, 503 while still starting"""
+    stations = {engine.station: {'ready': engine.ready, 'startup': engine.startup,
+                                 'error': str(engine.startup_error) if engine.startup_error else None}
+                for engine in engines.values()}
+    all_ready = bool(stations) and all(s['ready'] for s in stations.values())
+    return {'ready': all_ready, 'startup': STARTUP, 'stations': stations}, 200 if all_ready else 503
+
+@app.route('/ready')
+def ready():
+    body, status = readiness()
+    return jsonify(body), status
+
+def wait_readable(fd, timeout):
+    """Park the current greenlet until fd is readable or timeout expires (Pipeline wake-ups)"""
+    try:
+        eventlet.hubs.trampoline(fd, read=True, timeout=timeout)
+    except eventlet.Timeout:
+        pass
+
+def mediapipe_solutions():
+    """mediapipe.solutions, imported on first use (the import alone takes ~1 s)"""
+    import mediapipe as mp
+    return mp.solutions
+
+def to_full_frame(results, roi, w, h):
+    """Map landmarks from ROI-normalized to full-frame-normalized coordinates (in place)"""
+    if not results.multi_hand_landmarks:
+        return
+    x0, y0, x1, y1 = roi
+    sx, sy = (x1 - x0) / w, (y1 - y0) / h
+    ox, oy = x0 / w, y0 / h
+    landmark_array = getattr(results, 'landmark_array', None)
+    if landmark_array is not None:
+        landmark_array[..., 0] = ox + landmark_array[..., 0] * sx
+        landmark_array[..., 1] = oy + landmark_array[..., 1] * sy
+    for hand_landmarks in results.multi_hand_landmarks:
+        for lm in hand_landmarks.landmark:
+            lm.x = ox + lm.x * sx
+            lm.y = oy + lm.y * sy
+
+HANDS_OPTIONS = dict(
+    static_image_mode=False,
+    max_num_hands=1,
+    min_detection_confidence=0.7,
+    min_tracking_confidence=0.7
+)
+
+def create_hands(model_complexity=1):
+    return mediapipe_solutions().hands.Hands(model_complexity=model_complexity, **HANDS_OPTIONS)
+
+class InferenceGovernor:
+    """
+    Holds a target FPS / latency budget on slow CPUs by walking down a ladder
+    of cheaper settings (smaller input, lighter model, inferring every Nth
+    frame) when measured hands.process latency is over budget, and back up
+    when there is headroom.
+    """
+
+    # (input scale, model_complexity, infer every Nth frame)
+    LEVELS = [
+        (1.0, 1, 1),
+        (0.75, 1, 1),
+        (0.75, 0, 1),
+        (0.5, 0, 1),
+        (0.5, 0, 2),
+        (0.5, 0, 3),
+    ]
+
+    def __init__(self, target_fps=20.0, latency_budget_ms=50.0, cooldown=15):
+        self.target_fps = target_fps
+        self.latency_budget_ms = latency_budget_ms
+        self.cooldown = cooldown     # inferred frames between level changes
+        self.level = 0
+        self.ewma_ms = None
+        self.frame_count = 0
+        self.skipped = 0
+        self._since_change = 0
+
+    @property
+    def budget_ms(self):
+        return min(self.latency_budget_ms, 1000.0 / self.target_fps)
+
+    @property
+    def settings(self):
+        return self.LEVELS[self.level]
+
+    def should_infer(self):
+        self.frame_count += 1
+        stride = self.settings[2]
+        if stride > 1 and self.frame_count % stride:
+            self.skipped += 1
+            return False
+        return True
+
+    def record(self, elapsed):
+        """Feed one hands.process latency; returns True when the level changed"""
+        ms = elapsed * 1000.0
+        self.ewma_ms = ms if self.ewma_ms is None else 0.8 * self.ewma_ms + 0.2 * ms
+        self._since_change += 1
+        if self._since_change < self.cooldown:
+            return False
+
+        # Per-frame cost is spread over the stride when skipping frames
+        effective = self.ewma_ms / self.settings[2]
+        if effective > self.budget_ms and self.level < len(self.LEVELS) - 1:
+            self.level += 1
+        elif effective < 0.5 * self.budget_ms and self.level > 0:
+            self.level -= 1
+        else:
+            return False
+        self._since_change = 0
+        return True
+
+    def snapshot(self):
+        scale, complexity, stride = self.settings
+        return {
+            'level': self.level,
+            'scale': scale,
+            'model_complexity': complexity,
+            'stride': stride,
+            'latency_ewma_ms': round(self.ewma_ms or 0.0, 2),
+            'budget_ms': round(self.budget_ms, 2),
+            'skipped_frames': self.skipped,
+        }
 
 class VisionEngine:
-    def __init__(self):
-        self.cap = cv2.VideoCapture(0)
-        self.hands = mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=1,
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.7
-        )
+    def __init__(self, source=0, headless=False, roi=False, governor=None,
+                 name=None, namespace='/', lock_file='center_lock.npy', hands_factory=None,
+                 ring_slots=0, shared_ring=False, multi_target=False,
+                 calibration_file='screen_calibration.npz', lazy=False, capture_options=None, loops=1):
+        self.name = name
+        self.namespace = namespace
+        self.lock_file = lock_file
+        self.calibration_file = calibration_file
+        self.tag = f"[{name}] " if name else ""
+        self.headless = headless
+        self.source = source
+        self.capture_options = capture_options or {}   # fourcc/width/height/fps/buffer_size/threaded
+        self.loops = loops          # passes over a file source (0 = forever)
+        self.cap = None
+        # model_complexity -> Hands-like object (in-process graph or worker session)
+        self.hands_factory = hands_factory or create_hands
+        self.hands = None
+        self.model_complexity = 1
+        self.ready = False
+        self.startup = {}           # phase -> seconds
+        self.startup_error = None
+        self.governor = governor
+        self.tip_history = []   # last two inferred (timestamp, tips) for interpolation
+
+        # Preallocated frame buffers (0 slots = allocate per frame as before)
+        self.ring_slots = ring_slots
+        self.shared_ring = shared_ring
+        self.frame_ring = None
+        self.raw_frame = None
+        self._buffers = {}
         
-        self.target_center = None
-        self.auto_locked = False
+        # Every known button, with per-target debounce and a grid index for hit tests
+        self.targets = TargetMap(hit_radius=90, debounce=2.0)
+        self.multi_target = multi_target    # track every cyan button, not just the largest
         self.last_scan_time = 0
-        self.last_click_time = 0
+        self.scan_interval = 3.0
+        self.smoother = None    # HandSmoother when temporal smoothing is enabled
+        self.recorder = None
+        self.motion = None      # MotionGate when motion-gated inference is enabled
+        # Socket.IO server and how cooperative stages run (see use_server for asyncio mode)
+        self.sio = sio
+        self.spawn = eventlet.spawn
+        self.sleep = eventlet.sleep
+        self.wait_readable = wait_readable
+        self.stream = StateStream(sio, namespace)   # per-frame binary state for subscribed pages
+        self.preview = None     # PreviewStream when the MJPEG endpoint is enabled
+        self.tick = False       # broadcast a 'tick' per frame (see loadtest.py)
+        self.ticks = 0          # ticks emitted; tick n is the n-th vision_events_total{event="tick"}
+        self.frame_seq = 0
+        self.last_tip = None
+        self.pipeline = None
+
+        # Region-of-interest inference around the locked target
+        self.roi_enabled = roi
+        self.roi_padding = 160      # px beyond the 90 px trigger radius
+        self.roi_miss_limit = 15    # frames without a hand before going full frame
+        self.roi_misses = 0
+        self.roi_full_frame = True
         
         # Cyan color range for button detection
         self.lower_cyan = np.array([85, 100, 100])
         self.upper_cyan = np.array([105, 255, 255])
+        self.button_tracker = ButtonTracker(self.lower_cyan, self.upper_cyan)
 
-        # Load existing lock if any
+        # Camera -> projector homography; calibration dots are small magenta blobs
+        self.calibration = None
+        self.calibrating = None     # CalibrationSession while 'C' calibration runs
+        self.dot_tracker = ButtonTracker(DOT_LOWER, DOT_UPPER, min_radius=3, max_radius=80)
+
+        # Load existing lock and calibration if any
         self.load_lock()
+        self.load_calibration()
 
-    def load_lock(self):
-        if os.path.exists('center_lock.npy'):
+        # lazy: the caller starts initialize_background() so the server can listen first
+        if not lazy:
+            self.initialize()
+
+    # --- STARTUP ---
+    def open_capture(self):
+        t0 = time.perf_counter()
+        self.cap = self.source if hasattr(self.source, 'read') else open_source(self.source, self.loops, **self.capture_options)
+        if not self.cap.isOpened():
+            # Fail startup so /ready stays 503 instead of reporting a dead camera as ready
+            self.cap.release()
+            raise RuntimeError(f"could not open capture source {self.source!r}")
+        if hasattr(self.cap, 'mode'):
+            print(f"📷 {self.tag}Capture mode: {self.cap.mode}")
+        self.startup['capture_open'] = round(time.perf_counter() - t0, 4)
+
+    def init_hands(self, warmup_shape=None):
+        """Build the hands graph; with warmup_shape, run it once on a blank frame"""
+        t0 = time.perf_counter()
+        self.hands = self.hands_factory(self.model_complexity)
+        t1 = time.perf_counter()
+        self.startup['hands_init'] = round(t1 - t0, 4)
+        if warmup_shape is not None:
+            # The first process() call loads the model and allocates the graph
+            self.hands.process(np.zeros(warmup_shape, dtype=np.uint8))
+            self.startup['warmup'] = round(time.perf_counter() - t1, 4)
+
+    def initialize(self, warmup_shape=None):
+        self.open_capture()
+        self.init_hands(warmup_shape)
+        self.ready = True
+
+    def initialize_background(self, warmup_shape=(720, 1280, 3)):
+        """Open the capture device and build + warm up hands on OS threads; returns at once"""
+        def guarded(step, *args):
             try:
-                self.target_center = tuple(np.load('center_lock.npy').tolist())
-                print(f"🔒 Target Lock Loaded: {self.target_center}")
-            except:
-                pass
-
-    def find_button(self, frame):
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        mask = cv2.inRange(hsv, self.lower_cyan, self.upper_cyan)
-        mask = cv2.erode(mask, None, iterations=2)
-        mask = cv2.dilate(mask, None, iterations=2)
-        
-        contours, _ = cv2.findContours(mask.copy(), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        if contours:
-            c = max(contours, key=cv2.contourArea)
-            ((x, y), radius) = cv2.minEnclosingCircle(c)
-            if 20 < radius < 300:
-                return (int(x), int(y)), int(radius)
-        return None, None
-
-    def run(self):
-        print("Vision Engine Started. Waiting for connections...")
-        while True:
+                step(*args)
+            except Exception as e:
+                self.startup_error = e
+
+        def init():
+            t0 = time.perf_counter()
+            workers = [threading.Thread(target=guarded, args=(self.open_capture,), daemon=True),
+                       threading.Thread(target=guarded, args=(self.init_hands, warmup_shape), daemon=True)]
+            for t in workers:
+                t.start()
+            for t in workers:
+                t.join()
+            self.startup['initialize'] = round(time.perf_counter() - t0, 4)
+            self.startup['ready_since_start'] = round(time.perf_counter() - PROCESS_STARTED, 4)
+            self.ready = self.startup_error is None
+
+        threading.Thread(target=init, name=f"init-{self.station}", daemon=True).start()
+
+    def use_server(self, server, spawn=None, sleep=time.sleep):
+        """
+        Emit through another Socket.IO server (e.g. async_server.AsyncBridge).
+        spawn=None runs the trigger/render stages on OS threads instead of greenlets.
+        """
+        self.sio = server
+        self.spawn = spawn
+        self.sleep = sleep
+        self.wait_readable = None
+        self.stream = StateStream(server, self.namespace)
+
+    @property
+    def target_center(self):
+        """Center of the primary (lowest-id) target, or None"""
+        target = self.targets.primary
+        return target.center if target else None
+
+    @property
+    def auto_locked(self):
+        target = self.targets.primary
+        return target is not None and not target.manual
+
+    def load_lock(self):
+        try:
+            if self.targets.load(self.lock_file):
+                centers = [t.center for t in self.targets]
+                print(f"🔒 {self.tag}Target Lock Loaded: {centers[0] if len(centers) == 1 else centers}")
+        except:
+            pass
+
+    def save_lock(self):
+        self.targets.save(self.lock_file)
+
+    def load_calibration(self):
+        try:
+            calibration = Calibration.load(self.calibration_file)
+            if calibration is not None:
+                problem = calibration.problem()
+                if problem:
+                    print(f"⚠️  {self.tag}Ignoring {self.calibration_file}: {problem}; press 'C' to recalibrate")
+                    return
+                self.calibration = calibration
+                print(f"📐 {self.tag}Calibration Loaded: {self.calibration_file} "
+                      f"(camera {calibration.frame_size[0]}x{calibration.frame_size[1]})")
+        except ValueError as e:
+            print(f"⚠️  {self.tag}Ignoring calibration: {e}")
+        except:
+            pass
+
+    def find_buttons(self, frame):
+        """Full-frame scan for every cyan button: [((x, y), radius), ...], largest first"""
+        return self.button_tracker.detect_all(frame)
+
+    def inference_roi(self, w, h):
+        """Window (x0, y0, x1, y1) around the targets, or None for full frame"""
+        if not self.roi_enabled or self.roi_full_frame:
+            return None
+        return self.target_window(w, h)
+
+    def target_window(self, w, h):
+        """Window (x0, y0, x1, y1) spanning the targets plus padding, or None for full frame"""
+        bounds = self.targets.bounds()
+        if bounds is None:
+            return None
+        half = 90 + self.roi_padding
+        bx0, by0, bx1, by1 = bounds
+        size_w, size_h = min(bx1 - bx0 + 2 * half, w), min(by1 - by0 + 2 * half, h)
+        if size_w == w and size_h == h:
+            return None
+        # Keep the window size constant (clamp instead of shrink) so tracking stays stable
+        x0 = int(min(max(bx0 - half, 0), w - size_w))
+        y0 = int(min(max(by0 - half, 0), h - size_h))
+        return (x0, y0, x0 + size_w, y0 + size_h)
+
+    def update_roi_state(self, results, roi, w, h):
+        """Drop to full frame after a dry spell, return to the ROI once a hand is near the target"""
+        if not self.roi_enabled:
+            return
+        hands = results.multi_hand_landmarks if results else None
+        if roi is not None:
+            self.roi_misses = 0 if hands else self.roi_misses + 1
+            if self.roi_misses >= self.roi_miss_limit:
+                self.roi_full_frame = True
+            return
+        half = 90 + self.roi_padding
+        for hand_landmarks in hands or []:
+            tip = hand_landmarks.landmark[8]
+            for target in self.targets:
+                tx, ty = target.center
+                if abs(tip.x * w - tx) < half and abs(tip.y * h - ty) < half:
+                    self.roi_full_frame = False
+                    self.roi_misses = 0
+                    return
+
+    def detect_hands(self, packet):
+        frame = packet.frame
+        h, w, _ = frame.shape
+        roi = self.inference_roi(w, h)
+        image = frame if roi is None else frame[roi[1]:roi[3], roi[0]:roi[2]]
+        scale = self.governor.settings[0] if self.governor else 1.0
+        t0 = time.perf_counter()
+        if packet.ring_slot is not None and hasattr(self.hands, 'process_slot'):
+            # Worker process reads the shared ring slot in place and converts it there
+            t1 = t0
+            packet.results = self.hands.process_slot(*packet.ring_slot, frame.shape, roi, scale)
+        else:
+            if scale != 1.0:
+                ih, iw = image.shape[:2]
+                size = (max(int(iw * scale), 1), max(int(ih * scale), 1))
+                image = cv2.resize(image, size, dst=self.buffer('scaled', (size[1], size[0], 3)),
+                                   interpolation=cv2.INTER_AREA)
+            rgb_frame = cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=self.buffer('rgb', image.shape))
+            t1 = time.perf_counter()
+            packet.results = self.hands.process(rgb_frame)
+        if roi is not None:
+            to_full_frame(packet.results, roi, w, h)
+        t2 = time.perf_counter()
+        packet.roi = roi
+        self.update_roi_state(packet.results, roi, w, h)
+        packet.timings['convert'] = t1 - t0
+        packet.timings['hands'] = t2 - t1
+
+        packet.landmarks = list(packet.results.multi_hand_landmarks or [])
+        packet.landmark_array = landmarks_to_array(packet.results)
+        packet.tips = to_pixels(packet.landmark_array, w, h)
+        self.tip_history = (self.tip_history + [(packet.timestamp, packet.tips)])[-2:]
+
+        if self.governor and self.governor.record(t2 - t1):
+            self.apply_governor()
+        if self.motion is not None:
+            if len(packet.tips):
+                self.motion.keep_awake(packet.timestamp)
+            latency = self.motion.inferred(time.monotonic())
+            if latency is not None:
+                MOTION_WAKE.observe(latency, station=self.station)
+
+    def apply_governor(self):
+        scale, complexity, stride = self.governor.settings
+        print(f"⚙️  {self.tag}Governor level {self.governor.level}: scale {scale}, "
+              f"model_complexity {complexity}, every {stride} frame(s)")
+        if complexity != self.model_complexity:
+            self.hands.close()
+            self.hands = self.hands_factory(complexity)
+            self.model_complexity = complexity
+
+    def interpolate_tips(self, timestamp):
+        """Fingertips for a skipped frame, extrapolated from the last two inferences"""
+        if not self.tip_history:
+            return np.empty((0, 2), dtype=np.float32)
+        t_last, last = self.tip_history[-1]
+        if len(self.tip_history) < 2:
+            return last
+        t_prev, prev = self.tip_history[0]
+        if len(prev) != len(last) or t_last <= t_prev:
+            return last
+        k = (timestamp - t_last) / (t_last - t_prev)
+        return last + (last - prev) * k
+
+    # --- PIPELINE STAGES ---
+    def buffer(self, name, shape):
+        """Reusable scratch array owned by the stage that asks for it"""
+        buf = self._buffers.get(name)
+        if buf is None or buf.shape != shape:
+            buf = self._buffers[name] = np.empty(shape, dtype=np.uint8)
+        return buf
+
+    def frame_ring_for(self, shape):
+        if self.frame_ring is None or self.frame_ring.shape != shape:
+            if self.frame_ring is not None:
+                self.frame_ring.close()
+            self.frame_ring = FrameRing(shape, self.ring_slots, shared=self.shared_ring)
+        return self.frame_ring
+
+    def capture_frame(self):
+        t0 = time.perf_counter()
+        if not self.ring_slots:
             ret, frame = self.cap.read()
-            if not ret: break
-
-            frame = cv2.flip(frame, 1)
-            h, w, _ = frame.shape
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = self.hands.process(rgb_frame)
-
-            # --- AUTO-SCAN ---
-            if self.target_center is None or (time.time() - self.last_scan_time > 3.0):
-                self.last_scan_time = time.time()
-                center, radius = self.find_button(frame)
-                if center:
-                    self.target_center = center
-                    self.auto_locked = True
-                    print(f"✅ AUTO-DETECTED BUTTON AT {center}")
-
-            # --- HAND TRACKING ---
-            if results.multi_hand_landmarks:
-                for hand_landmarks in results.multi_hand_landmarks:
-                    index_tip = hand_landmarks.landmark[8]
-                    cx, cy = int(index_tip.x * w), int(index_tip.y * h)
-                    
-                    # Draw visual markers
-                    mp_drawing.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-                    cv2.circle(frame, (cx, cy), 10, (0, 255, 255), -1)
-
-                    # --- PROXIMITY TRIGGER ---
-                    if self.target_center:
-                        tx, ty = self.target_center
-                        dist = np.sqrt((cx - tx)**2 + (cy - ty)**2)
-                        
-                        if dist < 90: # In range
-                            cv2.circle(frame, (int(tx), int(ty)), 90, (0, 255, 0), 5)
-                            cv2.putText(frame, "TRIGGER!", (cx, cy-30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 3)
-                            
-                            if time.time() - self.last_click_time > 2.0:
-                                print(f"🎯 BUTTON HIT! Dist: {dist:.1f}")
-                                sio.emit('click', {'x': 0.5, 'y': 0.5})
-                                self.last_click_time = time.time()
-                        else:
-                            cv2.putText(frame, f"Dist: {int(dist)}", (cx+20, cy), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
-
-            # --- UI FEEDBACK ---
-            if self.target_center:
-                tx, ty = self.target_center
-                color = (255, 255, 0) if self.auto_locked else (255, 0, 0)
-                cv2.circle(frame, (int(tx), int(ty)), 90, color, 2)
-                cv2.putText(frame, "TARGET", (int(tx)-40, int(ty)-100), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
-
-            cv2.putText(frame, "Auto-Scanning... Press 'L' to Manual Lock", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-            cv2.imshow('Vision Engine', frame)
-
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord('q'): break
-            elif key == ord('l'): # Manual Lock override
-                # Find current index finger if possible
-                if results.multi_hand_landmarks:
-                    hand_landmarks = results.multi_hand_landmarks[0]
-                    index_tip = hand_landmarks.landmark[8]
-                    self.target_center = (int(index_tip.x * w), int(index_tip.y * h))
-                    self.auto_locked = False
-                    np.save('center_lock.npy', np.array(self.target_center))
-                    print(f"🔒 MANUALLY LOCKED AT {self.target_center}")
-
-        self.cap.release()
-        cv2.destroyAllWindows()
-
-@sio.event
-def connect(sid, environ):
-    print("Client connected:", sid)
+            if not ret:
+                return None
+            t1 = time.perf_counter()
+            self.frame_seq += 1
+            packet = FramePacket(self.frame_seq, cv2.flip(frame, 1), timestamp=self.capture_timestamp())
+        else:
+            # Decode into the reused raw buffer, then flip straight into a ring slot
+            ret, frame = self.cap.read(self.raw_frame)
+            if not ret:
+                return None
+            self.raw_frame = frame
+            t1 = time.perf_counter()
+            self.frame_seq += 1
+            ring = self.frame_ring_for(frame.shape)
+            slot, buf = ring.acquire()
+            packet = FramePacket(self.frame_seq, cv2.flip(frame, 1, dst=buf),
+                                 timestamp=self.capture_timestamp(),
+                                 on_release=lambda: ring.release(slot))
+            if ring.shared and slot is not None:
+                packet.ring_slot = (ring.shm_name, slot)
+        packet.timings['capture'] = t1 - t0
+        packet.timings['flip'] = time.perf_counter() - t1
+        return packet
+
+    def capture_timestamp(self):
+        """When the camera grabbed the last frame (None: stamp it now)"""
+        return getattr(self.cap, 'last_timestamp', None)
+
+    def infer(self, packet):
+        frame = packet.frame
+        if self.motion is not None:
+            # Static scene: skip MediaPipe entirely (wakes on change near the targets)
+            t0 = time.perf_counter()
+            h, w = frame.shape[:2]
+            awake = self.motion.should_infer(frame, packet.timestamp, self.target_window(w, h))
+            packet.timings['motion'] = time.perf_counter() - t0
+        else:
+            awake = True
+        if not awake:
+            packet.tips = np.empty((0, 2), dtype=np.float32)
+        elif self.governor is None or self.governor.should_infer():
+            self.detect_hands(packet)
+        else:
+            packet.tips = self.interpolate_tips(packet.timestamp)
+            packet.interpolated = True
+        t2 = time.perf_counter()
+
+        # --- AUTO-SCAN ---
+        if self.target_center is None or (time.time() - self.last_scan_time > self.scan_interval):
+            self.last_scan_time = time.time()
+            if self.multi_target:
+                self.scan_targets(packet)
+            else:
+                self.scan_target(packet)
+            packet.timings['find_button'] = time.perf_counter() - t2
+
+    def scan_target(self, packet):
+        """Single-button mode: track the largest blob (applied to the map by apply_scan)"""
+        center, radius = self.button_tracker.update(packet.frame)
+        packet.button = (center, radius) if center else None
+        packet.buttons = [packet.button] if center else []
+
+    def scan_targets(self, packet):
+        """Multi-button mode: every detected button (applied to the map by apply_scan)"""
+        buttons = self.find_buttons(packet.frame)
+        packet.button = buttons[0] if buttons else None
+        packet.buttons = buttons
+
+    def apply_scan(self, buttons):
+        """
+        Merge a scan's buttons into the target map. Runs in the trigger stage,
+        which reads the map every frame, so the inference thread never edits
+        it. In multi-target mode the map is saved whenever its ids change.
+        """
+        if self.multi_target:
+            known = set(self.targets.targets)
+            for target in self.targets.update_detections(buttons):
+                print(f"✅ {self.tag}AUTO-DETECTED BUTTON {target.id} AT {target.center}")
+            if set(self.targets.targets) != known:
+                self.save_lock()
+            return
+        if not buttons:
+            return
+        center, radius = buttons[0]
+        target = self.targets.primary
+        if target is None or target.manual or len(self.targets) > 1:
+            print(f"✅ {self.tag}AUTO-DETECTED BUTTON AT {center}")
+            self.targets.clear()
+            self.targets.add(center, radius)
+        else:
+            self.targets.move(target, center, radius)
+
+    def handle(self, packet):
+        """Proximity trigger: record per-hand hits and emit clicks"""
+        t0 = time.perf_counter()
+        if packet.buttons is not None:
+            self.apply_scan(packet.buttons)
+        if self.smoother is not None and packet.landmark_array is not None:
+            # Smooth, then extrapolate the fingertip from capture time to now
+            h, w = packet.frame.shape[:2]
+            smoothed = self.smoother.update(packet.landmark_array, w, h, packet.timestamp)
+            packet.tips = self.smoother.predict_tips(smoothed, time.monotonic(), packet.timestamp)
+        self.hit_test(packet)
+        packet.timings['trigger'] = time.perf_counter() - t0
+        if self.calibrating is not None:
+            self.calibrate_step(packet)
+        if self.stream.clients:
+            t1 = time.perf_counter()
+            self.stream.publish(self.pack_state(packet))
+            packet.timings['stream'] = time.perf_counter() - t1
+        if self.tick:
+            # Same broadcast path as 'click', but on every frame so fan-out cost is measurable
+            self.ticks += 1
+            self.emit('tick', {'seq': packet.seq, 'n': self.ticks,
+                               'captured': round(epoch_ms(packet.timestamp), 1)}, packet)
+        if self.recorder is not None:
+            self.recorder.write(packet, self.target_center)
+        self.observe(packet)
+
+    def hit_test(self, packet):
+        packet.hits = []
+        if len(packet.tips) == 0:
+            # No hands: every zone is left, so the next hand enters at `radius`, not release_radius
+            self.targets.hit_test(np.empty((0, 2), dtype=np.float32), packet.timestamp)
+            self.last_tip = None
+            return
+
+        tips = np.asarray(packet.tips, dtype=np.float32)
+        h, w = packet.frame.shape[:2]
+        if self.calibration is not None:
+            packet.screen_tips = self.calibration.map(tips, w, h)
+        # --- PROXIMITY TRIGGER (grid lookup of the targets near each fingertip) ---
+        nearest, fired = self.targets.hit_test(tips, packet.timestamp)
+        for target, i, dist in fired:
+            x, y = tips[i].tolist()
+            print(f"🎯 {self.tag}BUTTON {target.id} HIT! Dist: {dist:.1f}")
+            data = {'id': target.id, 'x': round(x / w, 4), 'y': round(y / h, 4),
+                    'seq': packet.seq, 'captured': round(epoch_ms(packet.timestamp), 1)}
+            if packet.screen_tips is not None:
+                # Projector pixels, so the page can draw right under the finger
+                sx, sy = packet.screen_tips[i].tolist()
+                data['sx'], data['sy'] = round(sx, 1), round(sy, 1)
+            self.emit('click', data, packet)
+
+        for i, ((x, y), near) in enumerate(zip(tips.tolist(), nearest)):
+            hand_landmarks = packet.landmarks[i] if i < len(packet.landmarks) else None
+            target, dist = near if near else (None, None)
+            packet.hits.append((hand_landmarks, int(x), int(y), dist, target))
+
+        _, cx, cy, _, _ = packet.hits[0]
+        self.last_tip = (cx, cy)
+
+    def pack_state(self, packet):
+        """Binary cursor/target state for this frame (see streaming.py)"""
+        if packet.screen_tips is not None:
+            positions, screen = packet.screen_tips, True
+        else:
+            h, w = packet.frame.shape[:2]
+            positions = np.asarray(packet.tips, dtype=np.float32).reshape(-1, 2) / (w, h)
+            screen = False
+        targets = [
+            (t.id, (STATE_INSIDE if t.trigger.inside else 0)
+                   | (STATE_FIRED if t.trigger.last_fire == packet.timestamp else 0))
+            for t in self.targets
+        ]
+        return pack_state(packet.seq, packet.timestamp, positions, targets, screen)
+
+    # --- CALIBRATION ---
+    def start_calibration(self):
+        """Project the first dot; SPACE (or 'calibrate_capture') records each one"""
+        self.calibrating = CalibrationSession()
+        print(f"📐 {self.tag}Calibration started: press SPACE when each dot is visible")
+        self.emit('calibration', self.calibrating.current())
+
+    def set_calibration_point(self, data):
+        """The page reports where (in screen px) it drew the current dot"""
+        session = self.calibrating
+        if session is not None and not session.done and data.get('step') == session.step:
+            session.screen_point = (float(data['x']), float(data['y']))
+            if 'width' in data and 'height' in data:
+                session.screen_size = (float(data['width']), float(data['height']))
+            else:
+                # Older pages: the dot sits at a known fraction of the screen
+                nx, ny = session.points[session.step]
+                session.screen_size = (session.screen_point[0] / nx, session.screen_point[1] / ny)
+
+    def request_calibration_capture(self):
+        if self.calibrating is not None:
+            self.calibrating.capture_requested = True
+
+    def calibrate_step(self, packet):
+        """Locate the projected dot (fingertip as fallback) and advance the session"""
+        session = self.calibrating
+        if not session.capture_requested:
+            return
+        session.capture_requested = False
+        if session.screen_point is None:
+            print(f"⚠️  {self.tag}Calibration: page has not shown dot {session.step + 1} yet")
+            return
+        center, _ = self.dot_tracker.detect(packet.frame)
+        if center is None:
+            if self.last_tip is None:
+                print(f"⚠️  {self.tag}Calibration: dot {session.step + 1} not found, point at it and retry")
+                return
+            center = self.last_tip
+        session.record((float(center[0]), float(center[1])))
+        print(f"📍 {self.tag}Calibration dot {session.step}/{len(session.points)} at {tuple(map(int, center))}")
+        if not session.done:
+            self.emit('calibration', session.current())
+            return
+
+        self.calibrating = None
+        h, w = packet.frame.shape[:2]
+        calibration, error = session.solve((w, h))
+        if calibration is None:
+            print(f"❌ {self.tag}Calibration failed: points are degenerate")
+            self.emit('calibration', {'done': True, 'ok': False})
+            return
+        problem = calibration.problem()
+        if problem:
+            print(f"❌ {self.tag}Calibration rejected: {problem}")
+            self.emit('calibration', {'done': True, 'ok': False})
+            return
+        self.calibration = calibration
+        calibration.save(self.calibration_file)
+        print(f"📐 {self.tag}Calibration saved to {self.calibration_file} (error {error:.1f} px)")
+        self.emit('calibration', {'done': True, 'ok': True, 'error': round(error, 2)})
+
+    def emit(self, event, data, packet=None):
+        t0 = time.perf_counter()
+        self.sio.emit(event, data, namespace=self.namespace)
+        if packet is not None:
+            packet.timings['emit'] = time.perf_counter() - t0
+            packet.events.append(event)
+            CAPTURE_TO_EMIT.observe(time.monotonic() - packet.timestamp, station=self.station)
+        EVENTS.inc(station=self.station, event=event)
+
+    # --- METRICS ---
+    @property
+    def station(self):
+        return self.name or 'default'
+
+    def observe(self, packet):
+        """Record a finished packet's stage timings"""
+        FRAMES.inc(station=self.station)
+        if packet.interpolated:
+            INTERPOLATED.inc(station=self.station)
+        for stage, seconds in packet.timings.items():
+            STAGE_LATENCY.observe(seconds, station=self.station, stage=stage)
+
+    def collect_metrics(self):
+        """Refresh scrape-time gauges for this station"""
+        station = self.station
+        if self.pipeline:
+            for name, stats in self.pipeline.stats.items():
+                STAGE_FPS.set(round(stats.fps, 2), station=station, stage=name)
+            for q in (self.pipeline.infer_queue, self.pipeline.trigger_queue, self.pipeline.render_queue):
+                DROPPED.set_total(q.dropped, station=station, queue=q.name)
+        if self.target_center:
+            TARGET.set(self.target_center[0], station=station, axis='x')
+            TARGET.set(self.target_center[1], station=station, axis='y')
+        TARGETS.set(len(self.targets), station=station)
+        STREAM_SENT.set_total(self.stream.sent, station=station)
+        STREAM_COALESCED.set_total(self.stream.coalesced, station=station)
+        if self.preview is not None:
+            PREVIEW_VIEWERS.set(self.preview.viewers, station=station)
+            PREVIEW_ENCODED.set_total(self.preview.encoded, station=station)
+        primary = self.targets.primary
+        TARGET_MANUAL.set(1 if primary is not None and primary.manual else 0, station=station)
+        if self.governor:
+            GOVERNOR_LEVEL.set(self.governor.level, station=station)
+        READY.set(1 if self.ready else 0, station=station)
+        reader = getattr(self.cap, 'reader', None)
+        if reader is not None:
+            CAPTURE_DROPPED.set_total(reader.dropped, station=station)
+        if self.motion is not None:
+            MOTION_SKIPPED.set(self.motion.snapshot()['skipped_ratio'], station=station)
+        for phase, seconds in self.startup.items():
+            STARTUP_SECONDS.set(seconds, station=station, phase=phase)
+
+    def annotate(self, packet):
+        """Draw the hand/target/status overlay onto the packet's frame"""
+        frame = packet.frame
+
+        # --- HAND TRACKING ---
+        solutions = mediapipe_solutions()
+        for hand_landmarks, cx, cy, dist, target in packet.hits:
+            # Draw visual markers
+            if hand_landmarks is not None:
+                solutions.drawing_utils.draw_landmarks(frame, hand_landmarks, solutions.hands.HAND_CONNECTIONS)
+            cv2.circle(frame, (cx, cy), 10, (0, 255, 255), -1)
+
+            if target is None:
+                continue
+            trigger = target.trigger
+            if dist < trigger.radius or (trigger.inside and dist < trigger.release_radius):
+                tx, ty = target.center
+                cv2.circle(frame, (int(tx), int(ty)), 90, (0, 255, 0), 5)
+                cv2.putText(frame, "TRIGGER!", (cx, cy-30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 3)
+            else:
+                cv2.putText(frame, f"Dist: {int(dist)}", (cx+20, cy), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+
+        # --- UI FEEDBACK ---
+        if packet.roi is not None:
+            x0, y0, x1, y1 = packet.roi
+            cv2.rectangle(frame, (x0, y0), (x1, y1), (128, 128, 128), 1)
+        for target in self.targets:
+            tx, ty = target.center
+            color = (255, 0, 0) if target.manual else (255, 255, 0)
+            label = "TARGET" if len(self.targets) == 1 else f"TARGET {target.id}"
+            cv2.circle(frame, (int(tx), int(ty)), 90, color, 2)
+            cv2.putText(frame, label, (int(tx)-40, int(ty)-100), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+
+        if self.calibrating is not None:
+            session = self.calibrating
+            cv2.putText(frame, f"Calibrating: dot {session.step + 1}/{len(session.points)} - Press SPACE",
+                        (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (234, 0, 255), 2)
+        else:
+            cv2.putText(frame, "Auto-Scanning... Press 'L' to Manual Lock, 'C' to Calibrate", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+
+    def render(self, packet):
+        """Preview window; returns False when the user quits"""
+        self.annotate(packet)
+        if self.preview is not None:
+            self.preview.submit(packet.frame)
+        cv2.imshow(f"Vision Engine {self.tag}".strip(), packet.frame)
+
+        key = cv2.waitKey(1) & 0xFF
+        if key == ord('q'): return False
+        elif key == ord('l'): # Manual Lock override
+            self.lock_target()
+        elif key == ord('c'):
+            self.start_calibration()
+        elif key == ord(' '):
+            self.request_calibration_capture()
+        return True
+
+    def render_preview(self, packet):
+        """Headless render stage: annotate only when an HTTP preview viewer wants a frame"""
+        if self.preview.wants_frame():
+            self.annotate(packet)
+            self.preview.submit(packet.frame)
+        return True
+
+    def enable_preview(self, quality=70, fps=10.0):
+        """Serve the annotated frame as MJPEG at /preview (see preview.py)"""
+        self.preview = PreviewStream(quality, fps)
+
+    def enable_motion_gate(self, idle_after=2.0, poll_interval=0.5):
+        """Only run hand inference on motion near the targets (see motion.py)"""
+        self.motion = MotionGate(idle_after=idle_after, poll_interval=poll_interval)
+
+    def enable_smoothing(self, min_cutoff=1.0, beta=0.02, release_radius=110):
+        """One-Euro smoothing + fingertip prediction, with a hysteresis band on the trigger zone"""
+        self.smoother = HandSmoother(min_cutoff=min_cutoff, beta=beta)
+        self.targets.set_zone(release_radius=release_radius)
+
+    def lock_target(self):
+        """
+        Manual lock on the current index fingertip, if a hand is visible. Replaces
+        the target in single-button mode, adds one in multi-target mode.
+        """
+        if self.last_tip is None:
+            print(f"⚠️  {self.tag}Manual lock ignored: no hand in view")
+            return False
+        if not self.multi_target:
+            self.targets.clear()
+        target = self.targets.add(self.last_tip, manual=True)
+        self.save_lock()
+        print(f"🔒 {self.tag}MANUALLY LOCKED {target.id} AT {target.center}")
+        return True
+
+    def stop(self):
+        if self.pipeline:
+            self.pipeline.stop()
+
+    def wait_ready(self):
+        """Cooperatively wait for initialize_background(); False if it failed"""
+        while not self.ready and self.startup_error is None:
+            self.sleep(0.02)
+        if self.startup_error is not None:
+            print(f"❌ {self.tag}Startup failed: {self.startup_error}")
+            return False
+        phases = ", ".join(f"{phase} {seconds * 1000:.0f}ms" for phase, seconds in self.startup.items())
+        print(f"🚦 {self.tag}Ready ({phases})")
+        self.emit('ready', {'startup': self.startup})
+        return True
+
+    def run(self, scheduler=None):
+        if not self.wait_ready():
+            return
+        print(f"Vision Engine {self.tag}Started. Waiting for connections...")
+        if self.headless:
+            print("🕶️  Headless mode: no preview window, use 'lock'/'quit' Socket.IO events")
+        if not self.headless:
+            render = self.render
+        elif self.preview is not None:
+            render = self.render_preview
+        else:
+            render = None
+        self.pipeline = Pipeline(
+            self.capture_frame, self.infer, self.handle, render,
+            spawn=self.spawn, sleep=self.sleep, wait_readable=self.wait_readable,
+            scheduler=scheduler, name=self.name
+        )
+        if self.governor:
+            self.pipeline.reporters['governor'] = self.governor.snapshot
+        self.pipeline.reporters['stream'] = self.stream.snapshot
+        if hasattr(self.cap, 'snapshot'):
+            self.pipeline.reporters['capture'] = self.cap.snapshot
+        if self.motion is not None:
+            self.pipeline.reporters['motion'] = self.motion.snapshot
+        if self.preview is not None:
+            self.pipeline.reporters['preview'] = self.preview.snapshot
+        self.pipeline.start()
+        self.pipeline.wait()
+        self.ready = False      # /ready goes back to 503 once frames stop
+
+        if self.cap is not None:
+            self.cap.release()
+        if self.frame_ring is not None:
+            self.frame_ring.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.preview is not None:
+            self.preview.close()
+        if not self.headless:
+            cv2.destroyAllWindows()
+
+engines = {}     # Socket.IO namespace -> VisionEngine
+
+def register_engine(engine, server=None):
+    """Expose an engine's lock/quit/calibration controls on its Socket.IO namespace"""
+    server = server or sio
+    ns = engine.namespace
+    engines[ns] = engine
+    registry.add_collector(engine.collect_metrics)
+
+    def on_connect(sid, environ):
+        print(f"Client connected: {sid} {engine.tag}".strip())
+        CLIENTS.inc(station=engine.station)
+
+    def on_disconnect(sid, *args):
+        CLIENTS.dec(station=engine.station)
+        engine.stream.unsubscribe(sid)
+
+    def on_subscribe(sid, data=None):
+        """Opt in to the per-frame binary 'state' stream"""
+        engine.stream.subscribe(sid)
+
+    def on_latency(sid, data):
+        """Batch of page-measured capture-to-render latencies, in ms"""
+        for ms in data.get('samples', ()):
+            CLIENT_LATENCY.observe(float(ms) / 1000.0, station=engine.station)
+
+    def on_lock(sid, data=None):
+        """Remote equivalent of the 'L' key"""
+        locked = engine.lock_target()
+        return {'ok': locked, 'target': engine.target_center,
+                'targets': [t.to_row() for t in engine.targets]}
+
+    def on_quit(sid, data=None):
+        """Remote equivalent of the 'q' key"""
+        print(f"🛑 {engine.tag}Quit requested by {sid}")
+        engine.stop()
+
+    server.on('connect', on_connect, namespace=ns)
+    server.on('disconnect', on_disconnect, namespace=ns)
+    server.on('lock', on_lock, namespace=ns)
+    server.on('quit', on_quit, namespace=ns)
+    server.on('subscribe', on_subscribe, namespace=ns)
+    server.on('latency', on_latency, namespace=ns)
+
+    def on_calibrate(sid, data=None):
+        """Remote equivalent of the 'C' key"""
+        engine.start_calibration()
+
+    def on_calibrate_capture(sid, data=None):
+        """Remote equivalent of SPACE during calibration"""
+        engine.request_calibration_capture()
+
+    def on_calibration_point(sid, data):
+        engine.set_calibration_point(data)
+
+    server.on('calibrate', on_calibrate, namespace=ns)
+    server.on('calibrate_capture', on_calibrate_capture, namespace=ns)
+    server.on('calibration_point', on_calibration_point, namespace=ns)
+
+def parse_station(spec):
+    """'name=source' -> (name, source)"""
+    name, sep, source = spec.partition('=')
+    if not sep or not name:
+        raise argparse.ArgumentTypeError(f"expected NAME=SOURCE, got {spec!r}")
+    return name, source
+
+def station_file(path, name):
+    """'center_lock.npy', 'lobby' -> 'center_lock_lobby.npy'"""
+    root, dot, ext = path.rpartition('.')
+    return f"{root}_{name}.{ext}" if dot else f"{path}_{name}"
+
+def parse_resolution(spec):
+    """'1280x720' -> (1280, 720)"""
+    try:
+        width, height = (int(v) for v in spec.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {spec!r}")
+    return width, height
+
+def run_stations(engines_to_run, workers=None):
+    """Run several engines in one process, sharing one inference worker pool"""
+    scheduler = InferenceScheduler(workers)
+    print(f"🧵 {len(engines_to_run)} station(s) sharing {scheduler.workers} inference worker(s)")
+    threads = [eventlet.spawn(engine.run, scheduler) for engine in engines_to_run]
+    for t in threads:
+        t.wait()
+    scheduler.stop()
 
 if __name__ == "__main__":
-    engine = VisionEngine()
-    eventlet.spawn(engine.run)
-    eventlet.wsgi.server(eventlet.listen(('', 5001)), app)
+    parser = argparse.ArgumentParser(description="Vision Engine")
+    parser.add_argument('--source', default='0',
+                        help="camera index, video file, image directory or synthetic[:WxH][@FPS]")
+    parser.add_argument('--station', action='append', type=parse_station, metavar='NAME=SOURCE',
+                        help="run several stations in one process (repeatable); each gets "
+                             "namespace /NAME, lock file center_lock_NAME.npy and screen_calibration_NAME.npz")
+    parser.add_argument('--lock-file', default='center_lock.npy',
+                        help="where target locks are loaded from and saved (per station: _NAME suffix)")
+    parser.add_argument('--calibration-file', default='screen_calibration.npz',
+                        help="camera -> screen calibration written by 'C' (per station: _NAME suffix)")
+    parser.add_argument('--workers', type=int,
+                        help="inference worker threads shared by all stations (default: cores - 1)")
+    parser.add_argument('--inference-processes', type=int, default=0,
+                        help="run MediaPipe in N worker processes fed through shared memory")
+    parser.add_argument('--frame-ring', type=int, default=0, metavar='SLOTS',
+                        help="capture into a preallocated ring of SLOTS frame buffers")
+    parser.add_argument('--shared-ring', action='store_true',
+                        help="back the frame ring with shared memory; --inference-processes "
+                             "workers then read ring slots in place instead of a copied frame")
+    parser.add_argument('--fourcc', choices=['MJPG', 'YUYV'],
+                        help="camera pixel format (MJPG usually allows higher FPS at 720p+)")
+    parser.add_argument('--resolution', type=parse_resolution, metavar='WxH',
+                        help="camera resolution, e.g. 1280x720")
+    parser.add_argument('--fps', type=float, help="camera frame rate to request")
+    parser.add_argument('--buffer-size', type=int, default=1,
+                        help="camera driver buffers (1 = least queued latency)")
+    parser.add_argument('--reader-thread', action='store_true',
+                        help="grab on a dedicated thread and always use the newest frame")
+    parser.add_argument('--roi', action='store_true',
+                        help="run hand inference only in a window around the locked target")
+    parser.add_argument('--track-button', action='store_true',
+                        help="re-localise the button every frame with the incremental tracker")
+    parser.add_argument('--multi-target', action='store_true',
+                        help="detect every cyan button as its own target (ids kept in the lock file)")
+    parser.add_argument('--governor', action='store_true',
+                        help="adapt inference resolution/model/cadence to hold --target-fps")
+    parser.add_argument('--target-fps', type=float, default=20.0)
+    parser.add_argument('--latency-budget', type=float, default=50.0,
+                        help="hands.process latency budget in ms")
+    parser.add_argument('--motion-gate', action='store_true',
+                        help="skip hand inference while nothing moves near the targets")
+    parser.add_argument('--idle-after', type=float, default=2.0,
+                        help="seconds without motion or hands before the gate idles")
+    parser.add_argument('--idle-poll', type=float, default=0.5,
+                        help="seconds between hand inferences while idle")
+    parser.add_argument('--smooth', action='store_true',
+                        help="One-Euro fingertip smoothing/prediction with trigger hysteresis")
+    parser.add_argument('--record', metavar='FILE',
+                        help="record landmarks, button and events to FILE (NAME.FILE per station); "
+                             "replay with landmark_log.py")
+    parser.add_argument('--preview', action='store_true',
+                        help="serve the annotated frame as MJPEG at /preview (/preview/NAME per station)")
+    parser.add_argument('--preview-quality', type=int, default=70, help="preview JPEG quality")
+    parser.add_argument('--preview-fps', type=float, default=10.0, help="preview frame rate cap")
+    parser.add_argument('--profile', action='store_true',
+                        help="enable the /debug/profile sampling profiler endpoint")
+    parser.add_argument('--port', type=int, default=5001)
+    parser.add_argument('--async', dest='async_mode', action='store_true',
+                        help="serve with asyncio (aiohttp + AsyncServer) instead of eventlet; "
+                             "stations run on executor threads")
+    parser.add_argument('--tick', action='store_true',
+                        help="broadcast a 'tick' event with seq and capture time on every frame (load tests)")
+    parser.add_argument('--loop', action='store_true',
+                        help="replay a video file or image directory source forever")
+    parser.add_argument('--headless', action='store_true',
+                        help="no preview window or overlays; control via Socket.IO 'lock'/'quit' events")
+    args = parser.parse_args()
+
+    app.config['PROFILING'] = args.profile
+
+    backend = None
+    if args.inference_processes:
+        backend = ProcessHandsBackend(args.inference_processes)
+        atexit.register(backend.close)
+
+    def make_hands_factory():
+        if backend is None:
+            return None
+        return lambda complexity: backend.session(model_complexity=complexity, **HANDS_OPTIONS)
+
+    server, bridge = sio, None
+    if args.async_mode:
+        from async_server import AsyncBridge
+        server = socketio.AsyncServer(async_mode='aiohttp', cors_allowed_origins='*', namespaces='*')
+        bridge = AsyncBridge(server)
+
+    width, height = args.resolution or (None, None)
+    capture_options = dict(fourcc=args.fourcc, width=width, height=height, fps=args.fps,
+                           buffer_size=args.buffer_size, threaded=args.reader_thread)
+
+    def make_governor():
+        return InferenceGovernor(args.target_fps, args.latency_budget) if args.governor else None
+
+    if args.station:
+        stations = [
+            VisionEngine(source=source, headless=args.headless, roi=args.roi,
+                         governor=make_governor(), name=name, namespace=f"/{name}",
+                         lock_file=station_file(args.lock_file, name),
+                         calibration_file=station_file(args.calibration_file, name),
+                         hands_factory=make_hands_factory(),
+                         ring_slots=args.frame_ring, shared_ring=args.shared_ring,
+                         multi_target=args.multi_target, lazy=True, capture_options=capture_options,
+                         loops=0 if args.loop else 1)
+            for name, source in args.station
+        ]
+    else:
+        stations = [VisionEngine(source=args.source, headless=args.headless, roi=args.roi,
+                                 governor=make_governor(), lock_file=args.lock_file,
+                                 calibration_file=args.calibration_file,
+                                 hands_factory=make_hands_factory(),
+                                 ring_slots=args.frame_ring, shared_ring=args.shared_ring,
+                                 multi_target=args.multi_target, lazy=True,
+                                 capture_options=capture_options, loops=0 if args.loop else 1)]
+
+    for engine in stations:
+        if args.track_button:
+            engine.scan_interval = 0.0
+        if args.smooth:
+            engine.enable_smoothing()
+        if args.motion_gate:
+            engine.enable_motion_gate(args.idle_after, args.idle_poll)
+        if args.preview:
+            engine.enable_preview(args.preview_quality, args.preview_fps)
+        engine.tick = args.tick
+        if args.record:
+            path = f"{engine.name}.{args.record}" if engine.name else args.record
+            engine.recorder = LandmarkRecorder(path)
+        if bridge is not None:
+            engine.use_server(bridge)
+        register_engine(engine, server)
+        engine.initialize_background()
+
+    def listening():
+        STARTUP['listen'] = round(time.perf_counter() - PROCESS_STARTED, 4)
+        print(f"🌐 Listening on :{args.port} after {STARTUP['listen'] * 1000:.0f}ms")
+
+    if bridge is not None:
+        from async_server import create_app, serve
+        if len(stations) == 1 and not args.workers:
+            jobs = [stations[0].run]
+        else:
+            scheduler = InferenceScheduler(args.workers)
+            print(f"🧵 {len(stations)} station(s) sharing {scheduler.workers} inference worker(s)")
+            jobs = [functools.partial(engine.run, scheduler) for engine in stations]
+        web_app = create_app(server, engines, readiness, profiler if args.profile else None)
+        serve(web_app, bridge, [engine.namespace for engine in stations], jobs, args.port, listening)
+    else:
+        if len(stations) == 1 and not args.workers:
+            eventlet.spawn(stations[0].run)
+        else:
+            eventlet.spawn(run_stations, stations, args.workers)
+        # Listen right away; capture and MediaPipe come up in the background (see /ready)
+        listener = eventlet.listen(('', args.port))
+        listening()
+        eventlet.wsgi.server(listener, app)